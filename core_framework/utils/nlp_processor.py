@@ -6,12 +6,102 @@ Handles natural language processing tasks for test automation
 
 import re
 import json
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterable, Iterator, List, Any, Optional, Tuple
 from dataclasses import dataclass
+from functools import lru_cache
+from itertools import count
 
-@dataclass
+# Optional: Numba-compiled duration scan for very large result sets
+try:
+    import numpy as np
+    from numba import njit
+except ImportError:
+    np = None
+    njit = None
+
+if njit is not None:
+    @njit(cache=True)
+    def _slow_step_indices(durations, threshold):
+        """Indices of steps whose duration exceeds the threshold"""
+        return np.where(durations > threshold)[0]
+
+# Below this many steps the plain Python scan beats JIT dispatch overhead
+_NUMBA_MIN_STEPS = 1024
+
+# Optional: Hyperscan multi-pattern prefilter for high-volume step parsing
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+# Test data extraction: zero-width alternatives so a URL inside a credential
+# (or vice versa) is still found; only the keywords are case-insensitive
+_EXTRACT_RE = re.compile(
+    r'(?=(?P<url>https?://[^\s]+))'
+    r'|(?=(?i:email)[:\s]+(?P<email>[^\s]+))'
+    r'|(?=(?i:password)[:\s]+(?P<password>[^\s]+))'
+)
+
+# Step actions in priority order; whitespace never spans a line break
+_ACTION_PATTERNS = (
+    ('navigate', r'(?:go to|navigate to|visit|open)[^\S\n]+(?P<nav_url>.+)'),
+    ('click', r'(?:click|press|tap)[^\S\n]+(?P<click_target>.+)'),
+    ('fill', r'(?:fill|enter|type|input)[^\S\n]+(?P<fill_field>.+?)[^\S\n]+(?:with|as)[^\S\n]+(?P<fill_value>.+)'),
+    ('verify', r'(?:verify|check|ensure|confirm)[^\S\n]+(?P<verify_target>.+)'),
+    ('wait', r'(?:wait for|wait until)[^\S\n]+(?P<wait_target>.+)'),
+    ('select', r'(?:select|choose)[^\S\n]+(?P<select_option>.+?)[^\S\n]+(?:from|in)[^\S\n]+(?P<select_list>.+)')
+)
+
+# Leading verbs simple enough to resolve without the regex
+_NAV_VERBS = ('go to', 'navigate to', 'visit', 'open')
+_CLICK_VERBS = ('click', 'press', 'tap')
+
+# One scan for every action: each alternative is a line-start-anchored lookahead,
+# so the first action listed above that matches anywhere on the line still wins
+_ACTION_RE = re.compile(
+    '|'.join(f'^(?=.*?(?P<{name}>{pattern}))' for name, pattern in _ACTION_PATTERNS),
+    re.IGNORECASE | re.MULTILINE
+)
+
+# With Hyperscan, one DFA scan reports which actions occur in a line; the
+# matching per-action regex then recovers the capture groups
+_HS_DB = None
+if hyperscan is not None:
+    _ACTION_REGEXES = tuple(re.compile(f'(?P<{name}>{pattern})', re.IGNORECASE) for name, pattern in _ACTION_PATTERNS)
+    _HS_DB = hyperscan.Database()
+    _HS_DB.compile(
+        expressions=[re.sub(r'\(\?P<\w+>', '(?:', pattern).encode('utf-8') for _, pattern in _ACTION_PATTERNS],
+        ids=list(range(len(_ACTION_PATTERNS))),
+        elements=len(_ACTION_PATTERNS),
+        flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH |
+               hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP] * len(_ACTION_PATTERNS)
+    )
+
+# Explicit selector syntax inside a step description
+_ID_RE = re.compile(r'#([\w-]+)')
+_CLASS_RE = re.compile(r'\.([\w-]+)')
+_NAME_RE = re.compile(r'name="([^"]*)"|name=\'([^\']*)\'')
+_TEXT_RE = re.compile(r'text="([^"]*)"|text=\'([^\']*)\'')
+
+# Keyword fallbacks, checked in order
+_KEYWORD_SELECTORS = {
+    'login': "[type='submit'], button[type='submit'], .login-btn",
+    'sign in': "[type='submit'], button[type='submit'], .login-btn",
+    'email': "[name='username'], [name='email'], #email, #username",
+    'username': "[name='username'], [name='email'], #email, #username",
+    'password': "[name='password'], [type='password'], #password",
+    'submit': "[type='submit'], button[type='submit']",
+    'send': "[type='submit'], button[type='submit']",
+    'button': "button",
+    'link': "a"
+}
+
+@dataclass(frozen=True)
 class TestStep:
     """Represents a single test step with NLP analysis"""
+    # Spelled out rather than dataclass(slots=True), which needs Python 3.10
+    __slots__ = ('step_number', 'action', 'selector', 'value', 'description', 'confidence')
+    
     step_number: int
     action: str
     selector: Optional[str]
@@ -22,50 +112,106 @@ class TestStep:
 class NLPProcessor:
     """Natural Language Processing for test automation"""
     
+    _CODE_HEADER = (
+        "// Auto-generated Playwright test from NLP",
+        "const { test, expect } = require('@playwright/test');",
+        "",
+        "test('NLP Generated Test', async ({ page }) => {"
+    )
+    
+    # Step description templates
+    _DESC_NAV = "Navigate to %s"
+    _DESC_CLICK = "Click %s"
+    _DESC_FILL = "Fill %s with %s"
+    _DESC_VERIFY = "Verify %s"
+    
+    # Playwright statement emitted for each supported action
+    _CODE_TEMPLATES = {
+        'navigate': "  await page.goto('{value}');",
+        'click': "  await page.click('{selector}');",
+        'fill': "  await page.fill('{selector}', '{value}');",
+        'verify': "  await expect(page.locator('{selector}')).toBeVisible();"
+    }
+    
     def __init__(self):
-        self.action_patterns = {
-            'navigate': r'(go to|navigate to|visit|open)\s+(.+)',
-            'click': r'(click|press|tap)\s+(.+)',
-            'fill': r'(fill|enter|type|input)\s+(.+?)\s+(with|as)\s+(.+)',
-            'verify': r'(verify|check|ensure|confirm)\s+(.+)',
-            'wait': r'(wait for|wait until)\s+(.+)',
-            'select': r'(select|choose)\s+(.+?)\s+(from|in)\s+(.+)'
-        }
-        
-        self.selector_patterns = {
-            'id': r'#([\w-]+)',
-            'class': r'\.([\w-]+)',
-            'name': r'name="([^"]*)"|name=\'([^\']*)\'',
-            'text': r'text="([^"]*)"|text=\'([^\']*)\'',
-            'button': r'button|btn',
-            'input': r'input|field|textbox',
-            'link': r'link|anchor|href'
-        }
+        # Shared, immutable tables; nothing is rebuilt per instance
+        self.action_patterns = _ACTION_PATTERNS
+        self._combined_action_re = _ACTION_RE
     
     def parse_natural_language_steps(self, text: str) -> List[TestStep]:
         """Parse natural language text into structured test steps"""
+        # TestStep is frozen, so cached steps can be shared; each caller gets its own list
+        return list(self._parse_cached(text))
+    
+    def iter_steps(self, text: str) -> Iterator[TestStep]:
+        """Lazily parse natural language text, yielding steps one line at a time"""
+        # Streams without building the line list; parse_natural_language_steps stays
+        # the cached, single-regex-pass path for blocks that fit comfortably in memory
+        text = text.strip()
+        start = 0
+        for i in count(1):
+            end = text.find('\n', start)
+            line = (text[start:] if end < 0 else text[start:end]).strip()
+            if line and line[0] != '#':
+                yield self._parse_single_step(i, line.lower())
+            if end < 0:
+                return
+            start = end + 1
+    
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _parse_cached(text: str) -> Tuple[TestStep, ...]:
+        """Parse a block of steps once per distinct input text"""
         steps = []
-        lines = text.strip().split('\n')
         
+        lines = [line.strip() for line in text.strip().lower().split('\n')]
+        
+        # Lines led by a navigate/click verb resolve directly and are blanked out
+        # of the buffer that the combined regex then scans in a single pass
+        quick = {}
         for i, line in enumerate(lines, 1):
-            line = line.strip()
-            if not line or line.startswith('#'):
-                continue
-                
-            step = self._parse_single_step(i, line)
-            if step:
-                steps.append(step)
+            if line and line[0] != '#':
+                step = NLPProcessor._parse_by_prefix(i, line)
+                if step:
+                    quick[i] = step
+        scanned = ['' if i in quick else line for i, line in enumerate(lines, 1)]
+        matches = None
+        if _HS_DB is None:
+            matches = {match.start(): match for match in _ACTION_RE.finditer('\n'.join(scanned))}
+        
+        offset = 0
+        for i, line in enumerate(scanned, 1):
+            start = offset
+            offset += len(line) + 1
+            if i in quick:
+                steps.append(quick[i])
+            elif line and line[0] != '#':
+                match = matches.get(start) if matches is not None else NLPProcessor._search_action(line)
+                steps.append(NLPProcessor._step_from_match(i, match, line))
         
-        return steps
+        return tuple(steps)
     
-    def _parse_single_step(self, step_num: int, text: str) -> Optional[TestStep]:
-        """Parse a single step from natural language"""
-        text = text.lower().strip()
+    @classmethod
+    def _parse_single_step(cls, step_num: int, text: str) -> Optional[TestStep]:
+        """Parse a single lowercased, stripped step from natural language"""
+        return (cls._parse_by_prefix(step_num, text) or
+                cls._step_from_match(step_num, cls._search_action(text), text))
+    
+    @classmethod
+    def _search_action(cls, text: str):
+        """Find the highest-priority action match in a single line"""
+        if _HS_DB is None:
+            return _ACTION_RE.search(text)
         
-        for action_type, pattern in self.action_patterns.items():
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                return self._create_test_step(step_num, action_type, match, text)
+        hits = []
+        _HS_DB.scan(text.encode('utf-8'), match_event_handler=lambda id, start, end, flags, context: hits.append(id))
+        return _ACTION_REGEXES[min(hits)].search(text) if hits else None
+    
+    @classmethod
+    def _step_from_match(cls, step_num: int, match, text: str) -> TestStep:
+        """Build a TestStep from an action match, or a generic step when nothing matched"""
+        if match:
+            return cls._create_test_step(step_num, match.lastgroup, match, text)
         
         # Fallback: treat as generic action
         return TestStep(
@@ -77,53 +223,77 @@ class NLPProcessor:
             confidence=0.3
         )
     
-    def _create_test_step(self, step_num: int, action_type: str, match, original_text: str) -> TestStep:
+    @classmethod
+    def _parse_by_prefix(cls, step_num: int, text: str) -> Optional[TestStep]:
+        """Resolve a step led by a navigate or click verb without running the regex"""
+        for verb in _NAV_VERBS:
+            if text.startswith(verb) and text[len(verb):len(verb) + 1].isspace():
+                return cls._navigate_step(step_num, text[len(verb):].strip())
+        
+        # Navigation outranks clicks anywhere on the line, so only unambiguous lines qualify
+        for verb in _CLICK_VERBS:
+            if text.startswith(verb) and text[len(verb):len(verb) + 1].isspace():
+                if any(nav_verb in text for nav_verb in _NAV_VERBS):
+                    return None
+                return cls._click_step(step_num, text[len(verb):].strip())
+        
+        return None
+    
+    @classmethod
+    def _navigate_step(cls, step_num: int, url: str) -> TestStep:
+        """Create a navigate TestStep"""
+        return TestStep(
+            step_number=step_num,
+            action='navigate',
+            selector=None,
+            value=url,
+            description=cls._DESC_NAV % url,
+            confidence=0.9
+        )
+    
+    @classmethod
+    def _click_step(cls, step_num: int, target: str) -> TestStep:
+        """Create a click TestStep"""
+        return TestStep(
+            step_number=step_num,
+            action='click',
+            selector=cls._extract_selector(target),
+            value=None,
+            description=cls._DESC_CLICK % target,
+            confidence=0.8
+        )
+    
+    @classmethod
+    def _create_test_step(cls, step_num: int, action_type: str, match, original_text: str) -> TestStep:
         """Create a TestStep object from parsed components"""
         if action_type == 'navigate':
-            url = match.group(2).strip()
-            return TestStep(
-                step_number=step_num,
-                action='navigate',
-                selector=None,
-                value=url,
-                description=f"Navigate to {url}",
-                confidence=0.9
-            )
+            return cls._navigate_step(step_num, match.group('nav_url').strip())
         
         elif action_type == 'click':
-            target = match.group(2).strip()
-            selector = self._extract_selector(target)
-            return TestStep(
-                step_number=step_num,
-                action='click',
-                selector=selector,
-                value=None,
-                description=f"Click {target}",
-                confidence=0.8
-            )
+            return cls._click_step(step_num, match.group('click_target').strip())
         
         elif action_type == 'fill':
-            field = match.group(2).strip()
-            value = match.group(4).strip()
-            selector = self._extract_selector(field)
+            field = match.group('fill_field').strip()
+            value = match.group('fill_value').strip()
+            selector = cls._extract_selector(field)
             return TestStep(
                 step_number=step_num,
                 action='fill',
                 selector=selector,
                 value=value,
-                description=f"Fill {field} with {value}",
+                description=cls._DESC_FILL % (field, value),
                 confidence=0.85
             )
         
         elif action_type == 'verify':
-            target = match.group(2).strip()
-            selector = self._extract_selector(target)
+            target = match.group('verify_target').strip()
+            selector = cls._extract_selector(target)
             return TestStep(
                 step_number=step_num,
                 action='verify',
                 selector=selector,
                 value=None,
-                description=f"Verify {target}",
+                description=cls._DESC_VERIFY % target,
                 confidence=0.7
             )
         
@@ -136,94 +306,80 @@ class NLPProcessor:
             confidence=0.5
         )
     
-    def _extract_selector(self, text: str) -> str:
-        """Extract CSS selector from natural language description"""
-        text = text.lower().strip()
-        
-        # Check for explicit selectors
-        for selector_type, pattern in self.selector_patterns.items():
-            match = re.search(pattern, text)
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _extract_selector(text: str) -> str:
+        """Extract CSS selector from a lowercased natural language description"""
+        # Explicit selectors; cheap substring probes gate each regex
+        if '#' in text:
+            match = _ID_RE.search(text)
+            if match:
+                return f"#{match.group(1)}"
+        if '.' in text:
+            match = _CLASS_RE.search(text)
+            if match:
+                return f".{match.group(1)}"
+        if 'name=' in text:
+            match = _NAME_RE.search(text)
+            if match:
+                value = match.group(1) if match.group(1) else match.group(2)
+                return f"[name='{value}']"
+        if 'text=' in text:
+            match = _TEXT_RE.search(text)
             if match:
-                if selector_type == 'id':
-                    return f"#{match.group(1)}"
-                elif selector_type == 'class':
-                    return f".{match.group(1)}"
-                elif selector_type == 'name':
-                    value = match.group(1) if match.group(1) else match.group(2)
-                    return f"[name='{value}']"
-                elif selector_type == 'text':
-                    value = match.group(1) if match.group(1) else match.group(2)
-                    return f"text='{value}'"
+                value = match.group(1) if match.group(1) else match.group(2)
+                return f"text='{value}'"
         
         # Intelligent guessing based on keywords
-        if 'login' in text or 'sign in' in text:
-            return "[type='submit'], button[type='submit'], .login-btn"
-        elif 'email' in text or 'username' in text:
-            return "[name='username'], [name='email'], #email, #username"
-        elif 'password' in text:
-            return "[name='password'], [type='password'], #password"
-        elif 'submit' in text or 'send' in text:
-            return "[type='submit'], button[type='submit']"
-        elif 'button' in text:
-            return "button"
-        elif 'link' in text:
-            return "a"
+        for keyword, selector in _KEYWORD_SELECTORS.items():
+            if keyword in text:
+                return selector
         
         # Default fallback
         return f"text='{text}'"
     
-    def generate_playwright_code(self, steps: List[TestStep]) -> str:
+    def generate_playwright_code(self, steps: Iterable[TestStep]) -> str:
         """Generate Playwright JavaScript code from test steps"""
-        code_lines = [
-            "// Auto-generated Playwright test from NLP",
-            "const { test, expect } = require('@playwright/test');",
-            "",
-            "test('NLP Generated Test', async ({ page }) => {"
-        ]
+        code_lines = list(self._CODE_HEADER)
         
+        # Each step contributes its lines in one extend
         for step in steps:
-            code_lines.append(f"  // Step {step.step_number}: {step.description}")
-            
-            if step.action == 'navigate':
-                code_lines.append(f"  await page.goto('{step.value}');")
-            elif step.action == 'click':
-                code_lines.append(f"  await page.click('{step.selector}');")
-            elif step.action == 'fill':
-                code_lines.append(f"  await page.fill('{step.selector}', '{step.value}');")
-            elif step.action == 'verify':
-                code_lines.append(f"  await expect(page.locator('{step.selector}')).toBeVisible();")
-            
-            code_lines.append("")
+            comment = f"  // Step {step.step_number}: {step.description}"
+            template = self._CODE_TEMPLATES.get(step.action)
+            if template:
+                code_lines += (comment, template.format(selector=step.selector, value=step.value), "")
+            else:
+                code_lines += (comment, "")
         
         code_lines.append("});")
         return "\n".join(code_lines)
     
     def analyze_test_results(self, results: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze test results using NLP techniques"""
+        summary = results.get('summary', {})
+        
+        # Analyze step performance (> 5 seconds)
+        steps = [step for browser_result in results.get('results', ()) for step in browser_result.get('steps', ())]
+        if njit is not None and len(steps) > _NUMBA_MIN_STEPS:
+            durations = np.fromiter((step.get('duration', 0) for step in steps), dtype=np.float64, count=len(steps))
+            slow_steps = [steps[i] for i in _slow_step_indices(durations, 5000.0)]
+        else:
+            slow_steps = [step for step in steps if step.get('duration', 0) > 5000]
+        
+        performance_insights = [
+            f"Step {step['step']} ({step['action']}) took {step['duration']}ms - consider optimization"
+            for step in slow_steps
+        ]
+        
         analysis = {
-            'overall_status': 'passed' if results.get('summary', {}).get('failed', 0) == 0 else 'failed',
-            'performance_insights': [],
+            'overall_status': 'passed' if summary.get('failed', 0) == 0 else 'failed',
+            'performance_insights': performance_insights,
             'failure_patterns': [],
             'recommendations': []
         }
         
-        # Analyze step performance
-        if 'results' in results:
-            for browser_result in results['results']:
-                if 'steps' in browser_result:
-                    for step in browser_result['steps']:
-                        duration = step.get('duration', 0)
-                        if duration > 5000:  # > 5 seconds
-                            analysis['performance_insights'].append(
-                                f"Step {step['step']} ({step['action']}) took {duration}ms - consider optimization"
-                            )
-        
         # Analyze failure patterns
-        failed_steps = []
-        if 'logs' in results:
-            for log in results['logs']:
-                if 'FAILED' in log:
-                    failed_steps.append(log)
+        failed_steps = [log for log in results.get('logs', ()) if 'FAILED' in log]
         
         if failed_steps:
             analysis['failure_patterns'] = failed_steps
@@ -245,19 +401,18 @@ class NLPProcessor:
             'test_steps': []
         }
         
-        # Extract URL
-        url_match = re.search(r'https?://[^\s]+', text)
-        if url_match:
-            data['url'] = url_match.group()
-        
-        # Extract credentials
-        email_match = re.search(r'email[:\s]+([^\s]+)', text, re.IGNORECASE)
-        if email_match:
-            data['credentials']['email'] = email_match.group(1)
+        # Extract URL and credentials in one pass; the first occurrence of each wins
+        found = {}
+        for match in _EXTRACT_RE.finditer(text):
+            found.setdefault(match.lastgroup, match.group(match.lastgroup))
+            if len(found) == 3:
+                break
         
-        password_match = re.search(r'password[:\s]+([^\s]+)', text, re.IGNORECASE)
-        if password_match:
-            data['credentials']['password'] = password_match.group(1)
+        data['url'] = found.get('url')
+        if 'email' in found:
+            data['credentials']['email'] = found['email']
+        if 'password' in found:
+            data['credentials']['password'] = found['password']
         
         # Parse steps
         data['test_steps'] = self.parse_natural_language_steps(text)
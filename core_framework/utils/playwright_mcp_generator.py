@@ -10,11 +10,13 @@ import asyncio
 import re
 import os
 from datetime import datetime
+from hashlib import blake2b
 from typing import Dict, List, Any, Optional, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 
 # Import our smart automation model for element detection
+import smart_automation_model
 from smart_automation_model import SmartElementDetector, SmartPageObjectGenerator, SmartAutomationModel
 
 try:
@@ -23,57 +25,216 @@ except ImportError:
     print("Please install playwright: pip install playwright")
     exit(1)
 
-@dataclass
-class PlaywrightMCPConfig:
-    """Configuration for Playwright MCP script generation"""
-    test_case_id: str
-    browser_type: str = "chromium"  # chromium, firefox, webkit
-    headless: bool = False
-    viewport: Dict[str, int] = None
-    timeout: int = 30000
-    slow_mo: int = 0
-    video_recording: bool = False
-    screenshot_on_failure: bool = True
-    trace_recording: bool = False
+try:
+    import aiofiles
+except ImportError:
+    aiofiles = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Both parsers accept the raw bytes of a JSON file
+_loads = orjson.loads if orjson is not None else json.loads
+
+# Step keywords in priority order; each branch is a lookahead matched at the
+# start of the step, so the first applicable alternative wins. Steps are
+# casefolded once before matching, so the pattern itself is case-sensitive
+_STEP_RE = re.compile(
+    r'(?P<nav>(?=.*navigate))'
+    r'|(?P<email>(?=.*email)(?=.*fill))'
+    r'|(?P<pwd>(?=.*password)(?=.*fill))'
+    r'|(?P<submit>(?=.*(?:sign in|login|click)))'
+    r'|(?P<verify>(?=.*(?:verify|dashboard)))',
+    re.DOTALL
+)
+
+def _classify_step(step: str) -> str:
+    """Return the action kind of a casefolded test step, or '' when unrecognized"""
+    match = _STEP_RE.match(step)
+    return match.lastgroup if match else ''
+
+def _dump_json(data: Any, indent: bool = False) -> bytes:
+    """Encode JSON with orjson when available; indent only human-read files"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(data, indent=2 if indent else None).encode()
+
+def _write_file(filename: str, content):
+    """Write one generated file (str or bytes); run in the default executor"""
+    with open(filename, 'wb' if isinstance(content, bytes) else 'w') as f:
+        f.write(content)
+
+async def _awrite(filename: str, content):
+    """Write one generated file without blocking the event loop"""
+    if aiofiles is None:
+        await asyncio.get_running_loop().run_in_executor(None, _write_file, filename, content)
+        return
+    async with aiofiles.open(filename, 'wb' if isinstance(content, bytes) else 'w') as f:
+        await f.write(content)
+
+# Per-step JS for each generator style, keyed by (step kind, style) and
+# filled in with str.format; unrecognized steps only keep their comment
+_STEP_TEMPLATES = {
+    ('nav', 'test'): (
+        "    await page.goto('{url}');\n"
+        "    await page.waitForLoadState('domcontentloaded');\n"),
+    ('email', 'test'): "    if (!authReused) await page.fill('{email_selector}', '{username}');\n",
+    ('pwd', 'test'): "    if (!authReused) await page.fill('{password_selector}', '{password}');\n",
+    ('submit', 'test'): (
+        "    if (!authReused) await page.click('{submit_selector}');\n"
+        "    await page.waitForLoadState('domcontentloaded');\n"),
+    ('verify', 'test'): (
+        "    // Verify successful login\n"
+        "    await expect(page).toHaveURL(/(?:dashboard|home|main)/);\n"
+        "    await expect(page.locator('body')).toBeVisible();\n"),
     
-class PlaywrightMCPGenerator:
-    """Generate Playwright MCP scripts with AI-powered element detection"""
+    ('nav', 'codegen'): (
+        "    console.log('Step {i}: Navigating to {url}');\n"
+        "    await page.goto('{url}');\n"
+        "    await page.waitForLoadState('domcontentloaded');\n"),
+    ('email', 'codegen'): (
+        "    console.log('Step {i}: Filling email field');\n"
+        "    await page.locator('{email_selector}').click();\n"
+        "    await page.locator('{email_selector}').fill('{username}');\n"),
+    ('pwd', 'codegen'): (
+        "    console.log('Step {i}: Filling password field');\n"
+        "    await page.locator('{password_selector}').click();\n"
+        "    await page.locator('{password_selector}').fill('{password}');\n"),
+    ('submit', 'codegen'): (
+        "    console.log('Step {i}: Clicking login button');\n"
+        "    await page.locator('{submit_selector}').click();\n"
+        "    await page.waitForLoadState('domcontentloaded');\n"),
+    ('verify', 'codegen'): (
+        "    console.log('Step {i}: Verifying successful login');\n"
+        "    await page.waitForURL(/(?:dashboard|home|main)/, {{ timeout: 10000 }});\n"
+        "    await page.screenshot({{ path: 'login-verification.png' }});\n"),
     
-    def __init__(self):
-        self.smart_model = SmartAutomationModel()
-        self.detected_elements = {}
-        self.page_objects = {}
-        
-    async def generate_playwright_script(self, test_config: Dict[str, Any]) -> Dict[str, str]:
-        """Generate complete Playwright MCP automation script"""
-        print("🎭 Generating Playwright MCP Script with AI Element Detection")
-        
-        # First, run smart detection to get element information
-        smart_results = await self.smart_model.process_test_case(test_config)
-        self.page_objects = smart_results.get('page_objects', {})
-        
-        # Generate different script variations
-        scripts = {
-            'playwright_test': self._generate_playwright_test_script(test_config),
-            'playwright_codegen': self._generate_codegen_style_script(test_config),
-            'playwright_mcp': self._generate_mcp_script(test_config),
-            'page_object_model': self._generate_page_object_script(test_config)
-        }
-        
-        # Save all generated scripts
-        await self._save_playwright_scripts(test_config, scripts)
-        
-        return scripts
+    ('nav', 'mcp'): (
+        "          console.log(`${{browserType}}: Step {i} - Navigating to URL`);\n"
+        "          await page.goto('{url}');\n"
+        "          await page.waitForLoadState('domcontentloaded');\n"),
+    ('email', 'mcp'): (
+        "          console.log(`${{browserType}}: Step {i} - Filling email`);\n"
+        "          await page.fill('{email_selector}', '{username}');\n"),
+    ('pwd', 'mcp'): (
+        "          console.log(`${{browserType}}: Step {i} - Filling password`);\n"
+        "          await page.fill('{password_selector}', '{password}');\n"),
+    ('submit', 'mcp'): (
+        "          console.log(`${{browserType}}: Step {i} - Clicking login`);\n"
+        "          await page.click('{submit_selector}');\n"
+        "          await page.waitForLoadState('domcontentloaded');\n"),
+    ('verify', 'mcp'): (
+        "          console.log(`${{browserType}}: Step {i} - Verifying success`);\n"
+        "          await page.waitForSelector('body', {{ timeout: 10000 }});\n"
+        "          await page.screenshot({{ path: `screenshots/${{browserType}}-success.png` }});\n"),
     
-    def _generate_playwright_test_script(self, test_config: Dict[str, Any]) -> str:
-        """Generate Playwright Test framework script"""
-        test_id = test_config.get('test_case_id', 'unknown')
-        test_data = test_config.get('test_data', {})
-        test_steps = test_config.get('test_steps', [])
-        
-        script = f'''// Generated Playwright Test Script
+    ('nav', 'pom'): "    await {page}Page.navigateTo('{url}');\n",
+    ('email', 'pom'): "    if (!authReused) await {page}Page.fill{email_element}('{username}');\n",
+    ('pwd', 'pom'): "    if (!authReused) await {page}Page.fill{password_element}('{password}');\n",
+    ('submit', 'pom'): (
+        "    if (!authReused) await {page}Page.click{submit_element}();\n"
+        "    await page.waitForLoadState('domcontentloaded');\n"),
+    ('verify', 'pom'): "    await expect(page).toHaveURL(/(?:dashboard|home|main)/);\n"
+}
+
+# Indentation of the per-step comment line in each style
+_STEP_INDENT = {'test': '    ', 'codegen': '    ', 'mcp': '          ', 'pom': '    '}
+
+# Recording add-ons for the MCP script, emitted only when the test config
+# enables video_recording / trace_recording
+_MCP_RECORD_VIDEO = ",\n        recordVideo: {{ dir: 'videos/' }}"
+_MCP_RECORD_HAR = ",\n        recordHar: {{ path: `har-files/${{browserType}}-{test_id}.har` }}"
+_MCP_TRACING_START = '''      // Enable tracing for debugging
+      await context.tracing.start({
+        screenshots: true,
+        snapshots: true,
+        sources: true
+      });
+      
+'''
+_MCP_TRACING_STOP = "        await ctx.context.tracing.stop({ path: `traces/${ctx.browserType}-trace.zip` });\n"
+
+# Cache entries are tied to the generator and detection code that produced them;
+# editing either module (templates included) invalidates every cached run
+_GENERATOR_VERSION = blake2b(
+    Path(__file__).read_bytes() + Path(smart_automation_model.__file__).read_bytes(),
+    digest_size=8).digest()
+
+# Output filename for each generated script type
+_FILENAME_TEMPLATES = {
+    'playwright_test': 'playwright_test_{tid}_{ts}.spec.js',
+    'playwright_codegen': 'playwright_codegen_{tid}_{ts}.js',
+    'playwright_mcp': 'playwright_mcp_{tid}_{ts}.js',
+    'page_object_model': 'playwright_pom_{tid}_{ts}.spec.js'
+}
+
+# Skeleton of the generated package.json; per-test fields are filled in on save
+_PACKAGE_JSON_TEMPLATE = {
+    "name": "",
+    "version": "1.0.0",
+    "description": "",
+    "scripts": {
+        "test": "npx playwright test",
+        "test:headed": "npx playwright test --headed",
+        "test:debug": "npx playwright test --debug",
+        "codegen": "",
+        "mcp": ""
+    },
+    "devDependencies": {
+        "@playwright/test": "^1.40.0",
+        "playwright": "^1.40.0"
+    }
+}
+
+# Setup project that logs in once and stores the session for the specs
+_LOGIN_SETUP_TEMPLATE = '''// Generated Playwright Auth Setup
 // Test Case ID: {test_id}
-// Generated on: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+
+const {{ test: setup }} = require('@playwright/test');
+
+setup('authenticate', async ({{ page }}) => {{
+  const loginUrl = '{url}';
+  await page.goto(loginUrl);
+  await page.fill('{email_selector}', '{username}');
+  await page.fill('{password_selector}', '{password}');
+  await page.click('{submit_selector}');
+  // Only a completed login is stored; a timeout here fails the setup project
+  await page.waitForURL({logged_in}, {{ timeout: 15000 }});
+  await page.context().storageState({{ path: '{state_file}' }});
+}});
+'''
+
+# playwright.config.js project entries, filled with the test's storage state file;
+# only the requested browsers are emitted
+_PW_PROJECTS = {
+    'chromium': '''    {{
+      name: 'chromium',
+      dependencies: ['setup'],
+      use: {{
+        ...require('@playwright/test').devices['Desktop Chrome'],
+        storageState: '{state_file}',
+        launchOptions: {{ args: ['--disable-dev-shm-usage'] }}
+      }}
+    }}''',
+    'firefox': '''    {{
+      name: 'firefox',
+      dependencies: ['setup'],
+      use: {{ ...require('@playwright/test').devices['Desktop Firefox'], storageState: '{state_file}' }}
+    }}''',
+    'webkit': '''    {{
+      name: 'webkit',
+      dependencies: ['setup'],
+      use: {{ ...require('@playwright/test').devices['Desktop Safari'], storageState: '{state_file}' }}
+    }}'''
+}
+
+# Boilerplate text for the generated files; templates that take values are
+# str.format strings (literal braces doubled), the rest are used verbatim
+_PW_TEST_HEADER = '''// Generated Playwright Test Script
+// Test Case ID: {test_id}
+// Generated on: {ts}
 
 import {{ test, expect }} from '@playwright/test';
 
@@ -81,49 +242,13 @@ test.describe('Automated Login Test - {test_id}', () => {{
   test('should login successfully', async ({{ page }}) => {{
     // Configure test settings
     test.setTimeout(60000);
+    // Login steps are skipped when the setup project already stored the session
+    const authReused = test.info().project.dependencies.includes('setup');
     
     // AI-detected elements with confidence scores
 '''
-        
-        # Add detected elements as comments
-        for page_name, page_data in self.page_objects.items():
-            script += f"    // Page: {page_name}\n"
-            for element_name, element_info in page_data.get('elements', {}).items():
-                confidence = element_info.get('confidence', 0)
-                selector = element_info.get('selector', '')
-                script += f"    // {element_name}: '{selector}' (confidence: {confidence:.2f})\n"
-        
-        script += "\n"
-        
-        # Generate test steps
-        for i, step in enumerate(test_steps, 1):
-            script += f"    // {step}\n"
-            
-            if "navigate" in step.lower():
-                script += f"    await page.goto('{test_data.get('url')}');\n"
-                script += "    await page.waitForLoadState('networkidle');\n"
-                
-            elif "email" in step.lower() and "fill" in step.lower():
-                email_selector = self._get_best_selector('email')
-                script += f"    await page.fill('{email_selector}', '{test_data.get('username')}');\n"
-                
-            elif "password" in step.lower() and "fill" in step.lower():
-                password_selector = self._get_best_selector('password')
-                script += f"    await page.fill('{password_selector}', '{test_data.get('password')}');\n"
-                
-            elif "sign in" in step.lower() or "login" in step.lower() or "click" in step.lower():
-                submit_selector = self._get_best_selector('submit')
-                script += f"    await page.click('{submit_selector}');\n"
-                script += "    await page.waitForLoadState('networkidle');\n"
-                
-            elif "verify" in step.lower() or "dashboard" in step.lower():
-                script += "    // Verify successful login\n"
-                script += "    await expect(page).toHaveURL(/.*dashboard.*|.*home.*|.*main.*/);\n"
-                script += "    await expect(page.locator('body')).toBeVisible();\n"
-            
-            script += "\n"
-        
-        script += '''    // Take screenshot for verification
+
+_PW_TEST_FOOTER = '''    // Take screenshot for verification
     await page.screenshot({ path: `test-results/login-success-${Date.now()}.png` });
     
     console.log('✅ Login test completed successfully');
@@ -135,26 +260,18 @@ test.describe('Automated Login Test - {test_id}', () => {{
   });
 });
 '''
-        
-        return script
-    
-    def _generate_codegen_style_script(self, test_config: Dict[str, Any]) -> str:
-        """Generate Playwright Codegen style script"""
-        test_id = test_config.get('test_case_id', 'unknown')
-        test_data = test_config.get('test_data', {})
-        test_steps = test_config.get('test_steps', [])
-        
-        script = f'''// Generated Playwright Codegen Style Script
+
+_CODEGEN_HEADER = '''// Generated Playwright Codegen Style Script
 // Test Case ID: {test_id}
-// Generated on: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+// Generated on: {ts}
 
 const {{ chromium }} = require('playwright');
 
 (async () => {{
   // Launch browser
   const browser = await chromium.launch({{
-    headless: {str(test_config.get('headless', False)).lower()},
-    slowMo: 1000 // Slow down for better visibility
+    headless: {headless},
+    slowMo: {slow_mo} // Set test_config['slow_mo'] to slow down for visibility
   }});
   
   const context = await browser.newContext({{
@@ -167,42 +284,8 @@ const {{ chromium }} = require('playwright');
     console.log('🎭 Starting Playwright automation...');
     
 '''
-        
-        # Generate steps in codegen style
-        for i, step in enumerate(test_steps, 1):
-            script += f"    // {step}\n"
-            
-            if "navigate" in step.lower():
-                script += f"    console.log('Step {i}: Navigating to {test_data.get('url')}');\n"
-                script += f"    await page.goto('{test_data.get('url')}');\n"
-                script += "    await page.waitForLoadState('networkidle');\n"
-                
-            elif "email" in step.lower() and "fill" in step.lower():
-                email_selector = self._get_best_selector('email')
-                script += f"    console.log('Step {i}: Filling email field');\n"
-                script += f"    await page.locator('{email_selector}').click();\n"
-                script += f"    await page.locator('{email_selector}').fill('{test_data.get('username')}');\n"
-                
-            elif "password" in step.lower() and "fill" in step.lower():
-                password_selector = self._get_best_selector('password')
-                script += f"    console.log('Step {i}: Filling password field');\n"
-                script += f"    await page.locator('{password_selector}').click();\n"
-                script += f"    await page.locator('{password_selector}').fill('{test_data.get('password')}');\n"
-                
-            elif "sign in" in step.lower() or "login" in step.lower() or "click" in step.lower():
-                submit_selector = self._get_best_selector('submit')
-                script += f"    console.log('Step {i}: Clicking login button');\n"
-                script += f"    await page.locator('{submit_selector}').click();\n"
-                script += "    await page.waitForLoadState('networkidle');\n"
-                
-            elif "verify" in step.lower() or "dashboard" in step.lower():
-                script += f"    console.log('Step {i}: Verifying successful login');\n"
-                script += "    await page.waitForURL(/.*dashboard.*|.*home.*|.*main.*/, { timeout: 10000 });\n"
-                script += "    await page.screenshot({ path: 'login-verification.png' });\n"
-            
-            script += "\n"
-        
-        script += '''    console.log('✅ Automation completed successfully');
+
+_CODEGEN_FOOTER = '''    console.log('✅ Automation completed successfully');
     
   } catch (error) {
     console.error('❌ Automation failed:', error);
@@ -212,18 +295,10 @@ const {{ chromium }} = require('playwright');
   }
 })();
 '''
-        
-        return script
-    
-    def _generate_mcp_script(self, test_config: Dict[str, Any]) -> str:
-        """Generate Multi-Context Playwright (MCP) script"""
-        test_id = test_config.get('test_case_id', 'unknown')
-        test_data = test_config.get('test_data', {})
-        test_steps = test_config.get('test_steps', [])
-        
-        script = f'''// Generated Playwright MCP (Multi-Context) Script
+
+_MCP_HEADER = '''// Generated Playwright MCP (Multi-Context) Script
 // Test Case ID: {test_id}
-// Generated on: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+// Generated on: {ts}
 
 const {{ chromium, firefox, webkit }} = require('playwright');
 
@@ -231,7 +306,7 @@ class PlaywrightMCPAutomation {{
   constructor(config = {{}}) {{
     this.config = {{
       browsers: ['chromium'], // Can test across multiple browsers
-      headless: {str(test_config.get('headless', False)).lower()},
+      headless: {headless},
       viewport: {{ width: 1280, height: 720 }},
       timeout: 30000,
       ...config
@@ -246,21 +321,12 @@ class PlaywrightMCPAutomation {{
     for (const browserType of this.config.browsers) {{
       const browser = await this.launchBrowser(browserType);
       const context = await browser.newContext({{
-        viewport: this.config.viewport,
-        recordVideo: {{ dir: 'videos/' }},
-        recordHar: {{ path: `har-files/${{browserType}}-{test_id}.har` }}
+        viewport: this.config.viewport{record_options}
       }});
       
       const page = await context.newPage();
       
-      // Enable tracing for debugging
-      await context.tracing.start({{
-        screenshots: true,
-        snapshots: true,
-        sources: true
-      }});
-      
-      this.contexts.push({{ browser, context, page, browserType }});
+{tracing_start}      this.contexts.push({{ browser, context, page, browserType }});
       this.pages.push(page);
     }}
   }}
@@ -269,7 +335,7 @@ class PlaywrightMCPAutomation {{
     const browsers = {{ chromium, firefox, webkit }};
     return await browsers[browserType].launch({{
       headless: this.config.headless,
-      slowMo: 500
+      slowMo: {slow_mo}
     }});
   }}
   
@@ -284,48 +350,16 @@ class PlaywrightMCPAutomation {{
         
         try {{
 '''
-        
-        # Generate test steps for MCP
-        for i, step in enumerate(test_steps, 1):
-            script += f"          // {step}\n"
-            
-            if "navigate" in step.lower():
-                script += f"          console.log(`${{browserType}}: Step {i} - Navigating to URL`);\n"
-                script += f"          await page.goto('{test_data.get('url')}');\n"
-                script += "          await page.waitForLoadState('networkidle');\n"
-                
-            elif "email" in step.lower() and "fill" in step.lower():
-                email_selector = self._get_best_selector('email')
-                script += f"          console.log(`${{browserType}}: Step {i} - Filling email`);\n"
-                script += f"          await page.fill('{email_selector}', '{test_data.get('username')}');\n"
-                
-            elif "password" in step.lower() and "fill" in step.lower():
-                password_selector = self._get_best_selector('password')
-                script += f"          console.log(`${{browserType}}: Step {i} - Filling password`);\n"
-                script += f"          await page.fill('{password_selector}', '{test_data.get('password')}');\n"
-                
-            elif "sign in" in step.lower() or "login" in step.lower() or "click" in step.lower():
-                submit_selector = self._get_best_selector('submit')
-                script += f"          console.log(`${{browserType}}: Step {i} - Clicking login`);\n"
-                script += f"          await page.click('{submit_selector}');\n"
-                script += "          await page.waitForLoadState('networkidle');\n"
-                
-            elif "verify" in step.lower() or "dashboard" in step.lower():
-                script += f"          console.log(`${{browserType}}: Step {i} - Verifying success`);\n"
-                script += "          await page.waitForSelector('body', { timeout: 10000 });\n"
-                script += "          await page.screenshot({ path: `screenshots/${browserType}-success.png` });\n"
-            
-            script += "\n"
-        
-        script += '''          console.log(`✅ ${browserType}: Test completed successfully`);
-          return { browserType, status: 'passed' };
+
+_MCP_FOOTER = '''          console.log(`✅ ${{browserType}}: Test completed successfully`);
+          return {{ browserType, status: 'passed' }};
           
-        } catch (error) {
-          console.error(`❌ ${browserType}: Test failed:`, error);
-          await page.screenshot({ path: `screenshots/${browserType}-error.png` });
-          return { browserType, status: 'failed', error: error.message };
-        }
-      });
+        }} catch (error) {{
+          console.error(`❌ ${{browserType}}: Test failed:`, error);
+          await page.screenshot({{ path: `screenshots/${{browserType}}-error.png` }});
+          return {{ browserType, status: 'failed', error: error.message }};
+        }}
+      }});
       
       // Wait for all tests to complete
       const results = await Promise.allSettled(testPromises);
@@ -333,230 +367,86 @@ class PlaywrightMCPAutomation {{
       // Generate test report
       this.generateReport(results);
       
-    } finally {
+    }} finally {{
       await this.cleanup();
-    }
-  }
+    }}
+  }}
   
-  generateReport(results) {
+  generateReport(results) {{
     console.log('\n📊 Multi-Context Test Report:');
     console.log('=' * 40);
     
-    results.forEach((result, index) => {
-      if (result.status === 'fulfilled') {
-        const { browserType, status } = result.value;
-        console.log(`${browserType}: ${status.toUpperCase()}`);
-      } else {
-        console.log(`Context ${index}: REJECTED - ${result.reason}`);
-      }
-    });
-  }
+    results.forEach((result, index) => {{
+      if (result.status === 'fulfilled') {{
+        const {{ browserType, status }} = result.value;
+        console.log(`${{browserType}}: ${{status.toUpperCase()}}`);
+      }} else {{
+        console.log(`Context ${{index}}: REJECTED - ${{result.reason}}`);
+      }}
+    }});
+  }}
   
-  async cleanup() {
+  async cleanup() {{
     console.log('🧹 Cleaning up contexts...');
     
-    for (const ctx of this.contexts) {
-      try {
-        await ctx.context.tracing.stop({ path: `traces/${ctx.browserType}-trace.zip` });
-        await ctx.context.close();
+    for (const ctx of this.contexts) {{
+      try {{
+{tracing_stop}        await ctx.context.close();
         await ctx.browser.close();
-      } catch (error) {
-        console.error(`Error closing ${ctx.browserType}:`, error);
-      }
-    }
-  }
-}
+      }} catch (error) {{
+        console.error(`Error closing ${{ctx.browserType}}:`, error);
+      }}
+    }}
+  }}
+}}
 
 // Execute the MCP automation
-(async () => {
-  const automation = new PlaywrightMCPAutomation({
+(async () => {{
+  const automation = new PlaywrightMCPAutomation({{
     browsers: ['chromium'], // Add 'firefox', 'webkit' for cross-browser testing
-    headless: ''' + str(test_config.get('headless', False)).lower() + '''
-  });
+    headless: {headless}
+  }});
   
   await automation.runTest();
-})();
+}})();
 '''
-        
-        return script
-    
-    def _generate_page_object_script(self, test_config: Dict[str, Any]) -> str:
-        """Generate Playwright script with Page Object Model"""
-        test_id = test_config.get('test_case_id', 'unknown')
-        test_data = test_config.get('test_data', {})
-        
-        script = f'''// Generated Playwright Page Object Model Script
+
+_POM_HEADER = '''// Generated Playwright Page Object Model Script
 // Test Case ID: {test_id}
-// Generated on: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+// Generated on: {ts}
 
 const {{ test, expect }} = require('@playwright/test');
 
 // AI-Generated Page Object Classes
 '''
-        
-        # Generate page object classes
-        for page_name, page_data in self.page_objects.items():
-            script += f'''class {page_name}Page {{
+
+_POM_CLASS_HEADER = '''class {page_name}Page {{
   constructor(page) {{
     this.page = page;
     
     // AI-detected selectors with confidence scores
 '''
-            
-            for element_name, element_info in page_data.get('elements', {}).items():
-                confidence = element_info.get('confidence', 0)
-                selector = element_info.get('selector', '')
-                script += f"    this.{element_name} = '{selector}'; // Confidence: {confidence:.2f}\n"
-            
-            script += "  }\n\n"
-            
-            # Generate action methods
-            for element_name, element_info in page_data.get('elements', {}).items():
-                element_type = element_info.get('type', 'other')
-                
-                if element_type == 'email':
-                    script += f'''  async fill{element_name.title()}(value) {{
-    await this.page.fill(this.{element_name}, value);
-  }}\n\n'''
-                elif element_type == 'password':
-                    script += f'''  async fill{element_name.title()}(value) {{
-    await this.page.fill(this.{element_name}, value);
-  }}\n\n'''
-                elif element_type == 'submit':
-                    script += f'''  async click{element_name.title()}() {{
-    await this.page.click(this.{element_name});
-  }}\n\n'''
-            
-            script += f'''  async navigateTo(url) {{
+
+_POM_CLASS_FOOTER = '''  async navigateTo(url) {
     await this.page.goto(url);
-    await this.page.waitForLoadState('networkidle');
-  }}
-}}
+    await this.page.waitForLoadState('domcontentloaded');
+  }
+}
 \n'''
-        
-        # Generate test using page objects
-        script += f'''// Test implementation using Page Objects
+
+_POM_TEST_HEADER = '''// Test implementation using Page Objects
 test.describe('Login Test with Page Objects - {test_id}', () => {{
   test('should login using page object model', async ({{ page }}) => {{
+    // Login steps are skipped when the setup project already stored the session
+    const authReused = test.info().project.dependencies.includes('setup');
 '''
-        
-        # Initialize page objects
-        for page_name in self.page_objects.keys():
-            script += f"    const {page_name.lower()}Page = new {page_name}Page(page);\n"
-        
-        script += "\n"
-        
-        # Generate test steps using page objects
-        test_steps = test_config.get('test_steps', [])
-        for i, step in enumerate(test_steps, 1):
-            script += f"    // {step}\n"
-            
-            if "navigate" in step.lower():
-                page_name = list(self.page_objects.keys())[0] if self.page_objects else 'login'
-                script += f"    await {page_name.lower()}Page.navigateTo('{test_data.get('url')}');\n"
-                
-            elif "email" in step.lower() and "fill" in step.lower():
-                email_element = self._get_element_name_by_type('email')
-                if email_element:
-                    page_name = list(self.page_objects.keys())[0] if self.page_objects else 'login'
-                    script += f"    await {page_name.lower()}Page.fill{email_element.title()}('{test_data.get('username')}');\n"
-                
-            elif "password" in step.lower() and "fill" in step.lower():
-                password_element = self._get_element_name_by_type('password')
-                if password_element:
-                    page_name = list(self.page_objects.keys())[0] if self.page_objects else 'login'
-                    script += f"    await {page_name.lower()}Page.fill{password_element.title()}('{test_data.get('password')}');\n"
-                
-            elif "sign in" in step.lower() or "login" in step.lower() or "click" in step.lower():
-                submit_element = self._get_element_name_by_type('submit')
-                if submit_element:
-                    page_name = list(self.page_objects.keys())[0] if self.page_objects else 'login'
-                    script += f"    await {page_name.lower()}Page.click{submit_element.title()}();\n"
-                    script += "    await page.waitForLoadState('networkidle');\n"
-                
-            elif "verify" in step.lower() or "dashboard" in step.lower():
-                script += "    await expect(page).toHaveURL(/.*dashboard.*|.*home.*|.*main.*/);\n"
-            
-            script += "\n"
-        
-        script += '''    console.log('✅ Page Object Model test completed');
+
+_POM_TEST_FOOTER = '''    console.log('✅ Page Object Model test completed');
   });
 });
 '''
-        
-        return script
-    
-    def _get_best_selector(self, element_type: str) -> str:
-        """Get the best selector for an element type"""
-        for page_data in self.page_objects.values():
-            for element_name, element_info in page_data.get('elements', {}).items():
-                if element_info.get('type') == element_type:
-                    return element_info.get('selector', f'[data-testid="{element_type}"]')
-        
-        # Fallback selectors
-        fallbacks = {
-            'email': 'input[type="email"], input[name*="email" i], input[name*="username" i]',
-            'password': 'input[type="password"]',
-            'submit': 'button[type="submit"], button:has-text("Login"), button:has-text("Sign in")'
-        }
-        return fallbacks.get(element_type, f'[data-testid="{element_type}"]')
-    
-    def _get_element_name_by_type(self, element_type: str) -> str:
-        """Get element name by type"""
-        for page_data in self.page_objects.values():
-            for element_name, element_info in page_data.get('elements', {}).items():
-                if element_info.get('type') == element_type:
-                    return element_name
-        return element_type
-    
-    async def _save_playwright_scripts(self, test_config: Dict[str, Any], scripts: Dict[str, str]):
-        """Save all generated Playwright scripts"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        test_id = test_config.get('test_case_id', 'unknown')
-        
-        saved_files = []
-        
-        for script_type, script_content in scripts.items():
-            if script_type == 'playwright_test':
-                filename = f"playwright_test_{test_id}_{timestamp}.spec.js"
-            elif script_type == 'playwright_codegen':
-                filename = f"playwright_codegen_{test_id}_{timestamp}.js"
-            elif script_type == 'playwright_mcp':
-                filename = f"playwright_mcp_{test_id}_{timestamp}.js"
-            elif script_type == 'page_object_model':
-                filename = f"playwright_pom_{test_id}_{timestamp}.spec.js"
-            else:
-                filename = f"playwright_{script_type}_{test_id}_{timestamp}.js"
-            
-            with open(filename, 'w') as f:
-                f.write(script_content)
-            
-            saved_files.append(filename)
-            print(f"📄 Generated: {filename}")
-        
-        # Create package.json for the generated scripts
-        package_json = {
-            "name": f"playwright-automation-{test_id.lower()}",
-            "version": "1.0.0",
-            "description": f"Generated Playwright automation scripts for test case {test_id}",
-            "scripts": {
-                "test": "npx playwright test",
-                "test:headed": "npx playwright test --headed",
-                "test:debug": "npx playwright test --debug",
-                "codegen": f"node playwright_codegen_{test_id}_{timestamp}.js",
-                "mcp": f"node playwright_mcp_{test_id}_{timestamp}.js"
-            },
-            "devDependencies": {
-                "@playwright/test": "^1.40.0",
-                "playwright": "^1.40.0"
-            }
-        }
-        
-        with open(f'package_{test_id}_{timestamp}.json', 'w') as f:
-            json.dump(package_json, f, indent=2)
-        
-        # Create playwright.config.js
-        config_content = f'''// Playwright Configuration
+
+_PW_CONFIG_TEMPLATE = '''// Playwright Configuration
 // Generated for test case: {test_id}
 
 module.exports = {{
@@ -568,42 +458,25 @@ module.exports = {{
   fullyParallel: true,
   forbidOnly: !!process.env.CI,
   retries: process.env.CI ? 2 : 0,
-  workers: process.env.CI ? 1 : undefined,
+  workers: process.env.PW_WORKERS ? parseInt(process.env.PW_WORKERS) : require('os').cpus().length,
   reporter: 'html',
   use: {{
-    baseURL: '{test_config.get('test_data', {}).get('url', '')}',
+    baseURL: '{base_url}',
     trace: 'on-first-retry',
     screenshot: 'only-on-failure',
     video: 'retain-on-failure'
   }},
   projects: [
     {{
-      name: 'chromium',
-      use: {{ ...require('@playwright/test').devices['Desktop Chrome'] }}
+      name: 'setup',
+      testMatch: /login\\.setup_.*\\.js/
     }},
-    {{
-      name: 'firefox',
-      use: {{ ...require('@playwright/test').devices['Desktop Firefox'] }}
-    }},
-    {{
-      name: 'webkit',
-      use: {{ ...require('@playwright/test').devices['Desktop Safari'] }}
-    }}
+{projects}
   ]
 }};
 '''
-        
-        with open(f'playwright.config_{test_id}_{timestamp}.js', 'w') as f:
-            f.write(config_content)
-        
-        print(f"\n📦 Generated Playwright Project Files:")
-        for file in saved_files:
-            print(f"  • {file}")
-        print(f"  • package_{test_id}_{timestamp}.json")
-        print(f"  • playwright.config_{test_id}_{timestamp}.js")
-        
-        # Create installation instructions
-        instructions = f'''# Playwright MCP Installation Instructions
+
+_INSTRUCTIONS_MD = '''# Playwright MCP Installation Instructions
 
 ## Generated for Test Case: {test_id}
 
@@ -648,16 +521,363 @@ npx playwright show-report
 
 ### 5. Cross-Browser Testing
 ```bash
-npx playwright test --project=chromium
-npx playwright test --project=firefox
-npx playwright test --project=webkit
+{project_commands}
 ```
 '''
+
+@dataclass(frozen=True)
+class PlaywrightMCPConfig:
+    """Configuration for Playwright MCP script generation"""
+    test_case_id: str
+    browser_type: str = "chromium"  # chromium, firefox, webkit
+    headless: bool = False
+    viewport: Dict[str, int] = field(default_factory=lambda: {"width": 1280, "height": 720})
+    timeout: int = 30000
+    slow_mo: int = 0
+    video_recording: bool = False
+    screenshot_on_failure: bool = True
+    trace_recording: bool = False
+    
+class PlaywrightMCPGenerator:
+    """Generate Playwright MCP scripts with AI-powered element detection"""
+    
+    # Used when no detected element has the requested type
+    _FALLBACK_SELECTORS = {
+        'email': 'input[type="email"], input[name*="email" i], input[name*="username" i]',
+        'password': 'input[type="password"]',
+        'submit': 'button[type="submit"], button:has-text("Login"), button:has-text("Sign in")'
+    }
+    
+    # Page-object action methods keyed by element type
+    _METHOD_TEMPLATES = {
+        'email': '''  async fill{cap}(value) {{
+    await this.page.fill(this.{name}, value);
+  }}\n\n''',
+        'password': '''  async fill{cap}(value) {{
+    await this.page.fill(this.{name}, value);
+  }}\n\n''',
+        'submit': '''  async click{cap}() {{
+    await this.page.click(this.{name});
+  }}\n\n'''
+    }
+    
+    def __init__(self):
+        self.smart_model: Optional[SmartAutomationModel] = None  # Model of the latest detection run
+        self.detected_elements = {}
+        self.page_objects = {}
+        self._indexed_page_objects = None
+        self._selector_cache = {}
+        self._element_name_cache = {}
+        self._cache_dir = Path('.pwmcp_cache')
+        self._begin_run({})
+        
+    def _begin_run(self, test_config: Dict[str, Any]):
+        """Stamp the current run so every generated file shares one timestamp"""
+        now = datetime.now()
+        self._ts_human = now.strftime("%Y-%m-%d %H:%M:%S")
+        self._ts_file = now.strftime("%Y%m%d_%H%M%S")
+        self._headless_js = 'true' if test_config.get('headless') else 'false'
+        self._slow_mo = test_config.get('slow_mo', 0)
+        
+    async def generate_playwright_script(self, test_config: Dict[str, Any]) -> Dict[str, str]:
+        """Generate complete Playwright MCP automation script"""
+        print("🎭 Generating Playwright MCP Script with AI Element Detection")
         
-        with open(f'PLAYWRIGHT_INSTRUCTIONS_{test_id}_{timestamp}.md', 'w') as f:
-            f.write(instructions)
+        # Identical input produces identical scripts, so reuse a previous run
+        key = blake2b(_GENERATOR_VERSION + json.dumps(test_config, sort_keys=True, default=str).encode(),
+                      digest_size=8).hexdigest()
+        cache_file = self._cache_dir / f"{key}.json"
+        if cache_file.exists():
+            cached = _loads(cache_file.read_bytes())
+            self.page_objects = cached.get('page_objects', {})
+            print(f"♻️ Reusing cached scripts for unchanged test case: {cache_file}")
+            files = cached.get('files')
+            if not files or not all(os.path.exists(name) for name in files):
+                # Outputs were removed since; write them again from the cached scripts
+                self._index_page_objects()
+                self._begin_run(test_config)
+                cached['files'] = await self._save_playwright_scripts(test_config, cached['scripts'])
+                await _awrite(str(cache_file), _dump_json(cached))
+            return cached['scripts']
+        
+        # First, run smart detection to get element information; a fresh model keeps
+        # page analyses from leaking between test cases, only the browser pool is shared
+        self.smart_model = SmartAutomationModel()
+        smart_results = await self.smart_model.process_test_case(test_config)
+        self.page_objects = smart_results.get('page_objects', {})
+        self._index_page_objects()
+        self._begin_run(test_config)
         
+        # Generate different script variations; this is pure-Python string building,
+        # so it runs inline, as worker threads would only serialize on the GIL
+        scripts = {
+            'playwright_test': self._generate_playwright_test_script(test_config),
+            'playwright_codegen': self._generate_codegen_style_script(test_config),
+            'playwright_mcp': self._generate_mcp_script(test_config),
+            'page_object_model': self._generate_page_object_script(test_config)
+        }
+        
+        # Save all generated scripts
+        files = await self._save_playwright_scripts(test_config, scripts)
+        
+        # Fallback selectors from a failed detection run must not be reused
+        if smart_results.get('status') == 'completed':
+            self._cache_dir.mkdir(exist_ok=True)
+            await _awrite(str(cache_file), _dump_json({'page_objects': self.page_objects, 'scripts': scripts,
+                                                       'files': files}))
+        
+        return scripts
+    
+    def _generate_playwright_test_script(self, test_config: Dict[str, Any]) -> str:
+        """Generate Playwright Test framework script"""
+        test_id = test_config.get('test_case_id', 'unknown')
+        test_data = test_config.get('test_data', {})
+        test_steps = test_config.get('test_steps', [])
+        url, username, password = test_data.get('url'), test_data.get('username'), test_data.get('password')
+        
+        parts = [_PW_TEST_HEADER.format(test_id=test_id, ts=self._ts_human)]
+        
+        # Add detected elements as comments
+        for page_name, page_data in self.page_objects.items():
+            parts.append(f"    // Page: {page_name}\n")
+            for element_name, element_info in page_data.get('elements', {}).items():
+                confidence = element_info.get('confidence', 0)
+                selector = element_info.get('selector', '')
+                parts.append(f"    // {element_name}: '{selector}' (confidence: {confidence:.2f})\n")
+        
+        parts.append("\n")
+        
+        # Generate test steps
+        ctx = {
+            'url': url, 'username': username, 'password': password,
+            'email_selector': self._get_best_selector('email'),
+            'password_selector': self._get_best_selector('password'),
+            'submit_selector': self._get_best_selector('submit')
+        }
+        parts.extend(self._render_step(_classify_step(step.casefold()), 'test', {**ctx, 'i': i, 'step': step})
+                     for i, step in enumerate(test_steps, 1))
+        
+        parts.append(_PW_TEST_FOOTER)
+        
+        return ''.join(parts)
+    
+    def _generate_codegen_style_script(self, test_config: Dict[str, Any]) -> str:
+        """Generate Playwright Codegen style script"""
+        test_id = test_config.get('test_case_id', 'unknown')
+        test_data = test_config.get('test_data', {})
+        test_steps = test_config.get('test_steps', [])
+        url, username, password = test_data.get('url'), test_data.get('username'), test_data.get('password')
+        
+        parts = [_CODEGEN_HEADER.format(test_id=test_id, ts=self._ts_human, headless=self._headless_js,
+                                        slow_mo=self._slow_mo)]
+        
+        # Generate steps in codegen style
+        ctx = {
+            'url': url, 'username': username, 'password': password,
+            'email_selector': self._get_best_selector('email'),
+            'password_selector': self._get_best_selector('password'),
+            'submit_selector': self._get_best_selector('submit')
+        }
+        parts.extend(self._render_step(_classify_step(step.casefold()), 'codegen', {**ctx, 'i': i, 'step': step})
+                     for i, step in enumerate(test_steps, 1))
+        
+        parts.append(_CODEGEN_FOOTER)
+        
+        return ''.join(parts)
+    
+    def _generate_mcp_script(self, test_config: Dict[str, Any]) -> str:
+        """Generate Multi-Context Playwright (MCP) script"""
+        test_id = test_config.get('test_case_id', 'unknown')
+        test_data = test_config.get('test_data', {})
+        test_steps = test_config.get('test_steps', [])
+        url, username, password = test_data.get('url'), test_data.get('username'), test_data.get('password')
+        
+        video, trace = test_config.get('video_recording'), test_config.get('trace_recording')
+        record_options = ((_MCP_RECORD_VIDEO if video else '') +
+                          (_MCP_RECORD_HAR if trace else '')).format(test_id=test_id)
+        
+        parts = [_MCP_HEADER.format(test_id=test_id, ts=self._ts_human, headless=self._headless_js,
+                                    slow_mo=self._slow_mo, record_options=record_options,
+                                    tracing_start=_MCP_TRACING_START if trace else '')]
+        
+        # Generate test steps for MCP
+        ctx = {
+            'url': url, 'username': username, 'password': password,
+            'email_selector': self._get_best_selector('email'),
+            'password_selector': self._get_best_selector('password'),
+            'submit_selector': self._get_best_selector('submit')
+        }
+        parts.extend(self._render_step(_classify_step(step.casefold()), 'mcp', {**ctx, 'i': i, 'step': step})
+                     for i, step in enumerate(test_steps, 1))
+        
+        parts.append(_MCP_FOOTER.format(headless=self._headless_js,
+                                        tracing_stop=_MCP_TRACING_STOP if trace else ''))
+        
+        return ''.join(parts)
+    
+    def _generate_page_object_script(self, test_config: Dict[str, Any]) -> str:
+        """Generate Playwright script with Page Object Model"""
+        test_id = test_config.get('test_case_id', 'unknown')
+        test_data = test_config.get('test_data', {})
+        
+        parts = [_POM_HEADER.format(test_id=test_id, ts=self._ts_human)]
+        
+        # Generate page object classes
+        for page_name, page_data in self.page_objects.items():
+            parts.append(_POM_CLASS_HEADER.format(page_name=page_name))
+            
+            # Selector declarations and action methods in one pass
+            sel_lines, method_lines = [], []
+            for element_name, element_info in page_data.get('elements', {}).items():
+                confidence = element_info.get('confidence', 0)
+                selector = element_info.get('selector', '')
+                sel_lines.append(f"    this.{element_name} = '{selector}'; // Confidence: {confidence:.2f}\n")
+                template = self._METHOD_TEMPLATES.get(element_info.get('type', 'other'))
+                if template:
+                    method_lines.append(template.format(name=element_name, cap=element_name.title()))
+            
+            parts.append(''.join(sel_lines))
+            parts.append("  }\n\n")
+            parts.append(''.join(method_lines))
+            
+            parts.append(_POM_CLASS_FOOTER)
+        
+        # Generate test using page objects
+        parts.append(_POM_TEST_HEADER.format(test_id=test_id))
+        
+        # Initialize page objects
+        for page_name in self.page_objects.keys():
+            parts.append(f"    const {page_name.lower()}Page = new {page_name}Page(page);\n")
+        
+        parts.append("\n")
+        
+        # Generate test steps using page objects
+        test_steps = test_config.get('test_steps', [])
+        url, username, password = test_data.get('url'), test_data.get('username'), test_data.get('password')
+        primary_page = next(iter(self.page_objects), 'login')
+        ctx = {
+            'url': url, 'username': username, 'password': password,
+            'page': primary_page.lower(),
+            'email_element': self._get_element_name_by_type('email').title(),
+            'password_element': self._get_element_name_by_type('password').title(),
+            'submit_element': self._get_element_name_by_type('submit').title()
+        }
+        parts.extend(self._render_step(_classify_step(step.casefold()), 'pom', {**ctx, 'i': i, 'step': step})
+                     for i, step in enumerate(test_steps, 1))
+        
+        parts.append(_POM_TEST_FOOTER)
+        
+        return ''.join(parts)
+    
+    def _render_step(self, kind: str, style: str, ctx: Dict[str, Any]) -> str:
+        """Render one test step as commented JS in the given generator style"""
+        body = _STEP_TEMPLATES.get((kind, style))
+        return f"{_STEP_INDENT[style]}// {ctx['step']}\n{body.format(**ctx) if body else ''}\n"
+    
+    def _index_page_objects(self):
+        """Map each element type to its first detected selector and element name"""
+        self._selector_cache = {}
+        self._element_name_cache = {}
+        for page_data in self.page_objects.values():
+            for element_name, element_info in page_data.get('elements', {}).items():
+                element_type = element_info.get('type')
+                self._selector_cache.setdefault(
+                    element_type, element_info.get('selector', f'[data-testid="{element_type}"]'))
+                self._element_name_cache.setdefault(element_type, element_name)
+        self._indexed_page_objects = self.page_objects
+    
+    def _get_best_selector(self, element_type: str) -> str:
+        """Get the best selector for an element type"""
+        if self._indexed_page_objects is not self.page_objects:
+            self._index_page_objects()
+        
+        selector = self._selector_cache.get(element_type)
+        if selector is not None:
+            return selector
+        return self._FALLBACK_SELECTORS.get(element_type, f'[data-testid="{element_type}"]')
+    
+    def _get_element_name_by_type(self, element_type: str) -> str:
+        """Get element name by type"""
+        if self._indexed_page_objects is not self.page_objects:
+            self._index_page_objects()
+        
+        return self._element_name_cache.get(element_type, element_type)
+    
+    async def _save_playwright_scripts(self, test_config: Dict[str, Any], scripts: Dict[str, str]) -> List[str]:
+        """Save all generated Playwright scripts and return the absolute paths written"""
+        timestamp = self._ts_file
+        test_id = test_config.get('test_case_id', 'unknown')
+        
+        # The emitted scripts are plain JavaScript, so .spec.ts output is not produced
+        if test_config.get('language', '').lower() in ('typescript', 'ts'):
+            print("⚠️ TypeScript requested, but Playwright scripts are generated as JavaScript (.spec.js)")
+        
+        saved_files = []
+
+        for script_type, script_content in scripts.items():
+            filename = _FILENAME_TEMPLATES.get(script_type, 'playwright_{s}_{tid}_{ts}.js').format(
+                s=script_type, tid=test_id, ts=timestamp)
+            
+            saved_files.append((filename, script_content))
+        
+        # Create package.json for the generated scripts
+        package_json = {
+            **_PACKAGE_JSON_TEMPLATE,
+            "name": f"playwright-automation-{test_id.lower()}",
+            "description": f"Generated Playwright automation scripts for test case {test_id}",
+            "scripts": {
+                **_PACKAGE_JSON_TEMPLATE["scripts"],
+                "codegen": f"node playwright_codegen_{test_id}_{timestamp}.js",
+                "mcp": f"node playwright_mcp_{test_id}_{timestamp}.js"
+            }
+        }
+        
+        # Each test case keeps its own session, like .auth/<id>.json on the Python side
+        state_file = f"storageState_{test_id}.json"
+        
+        # Create playwright.config.js and installation instructions
+        browsers = [b for b in test_config.get('browsers', ['chromium']) if b in _PW_PROJECTS]
+        config_content = _PW_CONFIG_TEMPLATE.format(
+            test_id=test_id, base_url=test_config.get('test_data', {}).get('url', ''),
+            projects=',\n'.join(_PW_PROJECTS[b].format(state_file=state_file) for b in browsers))
+        instructions = _INSTRUCTIONS_MD.format(
+            test_id=test_id, timestamp=timestamp,
+            project_commands='\n'.join(f"npx playwright test --project={b}" for b in browsers))
+        
+        test_data = test_config.get('test_data', {})
+        # Logged in once the browser leaves the login URL, or reaches login_success_path when given
+        success_path = test_data.get('login_success_path')
+        logged_in = (f"url => new RegExp({json.dumps(success_path)}).test(url.pathname)" if success_path
+                     else "url => url.href.replace(/\\/$/, '') !== loginUrl.replace(/\\/$/, '')")
+        login_setup = _LOGIN_SETUP_TEMPLATE.format(
+            test_id=test_id, url=test_data.get('url'), logged_in=logged_in, state_file=state_file,
+            username=test_data.get('username'), password=test_data.get('password'),
+            email_selector=self._get_best_selector('email'),
+            password_selector=self._get_best_selector('password'),
+            submit_selector=self._get_best_selector('submit'))
+        
+        # Write every file in one concurrent batch
+        file_list = saved_files + [
+            (f'login.setup_{test_id}_{timestamp}.js', login_setup),
+            (f'package_{test_id}_{timestamp}.json', _dump_json(package_json, indent=True)),
+            (f'playwright.config_{test_id}_{timestamp}.js', config_content),
+            (f'PLAYWRIGHT_INSTRUCTIONS_{test_id}_{timestamp}.md', instructions)
+        ]
+        await asyncio.gather(*(_awrite(name, content) for name, content in file_list))
+        
+        saved_files = [name for name, _ in saved_files]
+        for filename in saved_files:
+            print(f"📄 Generated: {filename}")
+        
+        print(f"\n📦 Generated Playwright Project Files:")
+        for file in saved_files:
+            print(f"  • {file}")
+        print(f"  • login.setup_{test_id}_{timestamp}.js")
+        print(f"  • package_{test_id}_{timestamp}.json")
+        print(f"  • playwright.config_{test_id}_{timestamp}.js")
         print(f"  • PLAYWRIGHT_INSTRUCTIONS_{test_id}_{timestamp}.md")
+        
+        return [os.path.abspath(name) for name, _ in file_list]
 
 # Main execution function
 async def main():
@@ -665,8 +885,7 @@ async def main():
     
     # Load test configuration
     try:
-        with open('sample.json', 'r') as f:
-            test_config = json.load(f)
+        test_config = _loads(Path('sample.json').read_bytes())
     except FileNotFoundError:
         print("❌ sample.json not found. Creating default configuration...")
         test_config = {
@@ -690,9 +909,12 @@ async def main():
     print("🎭 Playwright MCP Generator with AI Element Detection")
     print("=" * 60)
     
-    # Generate Playwright scripts
+    # Generate Playwright scripts; the pooled browser must not outlive the run
     generator = PlaywrightMCPGenerator()
-    scripts = await generator.generate_playwright_script(test_config)
+    try:
+        scripts = await generator.generate_playwright_script(test_config)
+    finally:
+        await SmartAutomationModel.shutdown()
     
     print("\n✅ Playwright MCP script generation completed!")
     print("\n📋 Generated Script Types:")
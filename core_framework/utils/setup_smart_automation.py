@@ -4,50 +4,202 @@ Smart Automation Model Setup Script
 Automatically installs dependencies and sets up the environment
 """
 
-import subprocess
+import argparse
+import asyncio
+import importlib.util
 import sys
 import os
+import select
+import shutil
+import tempfile
 import json
+from collections import deque
+from importlib import metadata
 from pathlib import Path
 
-def run_command(command, description):
-    """Run a command and handle errors"""
+try:
+    from packaging.requirements import Requirement
+except ImportError:
+    Requirement = None
+
+MIN_PYTHON = (3, 8)
+PLAYWRIGHT_PACKAGE = "playwright>=1.40.0"
+TEST_PACKAGES = ["pytest>=7.4.0", "pytest-asyncio>=0.21.0"]
+REQUIREMENTS_TXT = "\n".join(
+    ["# Smart Automation Model Requirements", PLAYWRIGHT_PACKAGE, *TEST_PACKAGES, ""])
+BROWSERS = ("chromium", "firefox", "webkit")
+# Skip pip's self-update check, prompts and progress rendering
+PIP_FLAGS = ["--disable-pip-version-check", "--no-input", "--no-color", "-q"]
+UV_FLAGS = ["--no-progress", "-q"]
+OUTPUT_TAIL_LINES = 50
+DEMO_TIMEOUT = 60
+PROMPT_TIMEOUT = 5
+
+# Set SMART_SETUP_VERBOSE=1 to echo pip / playwright output while it runs
+VERBOSE = bool(os.environ.get("SMART_SETUP_VERBOSE"))
+
+async def run_command(argv, description, env=None):
+    """Run a command given as an argv list and handle errors"""
     print(f"🔄 {description}...")
-    try:
-        result = subprocess.run(command, shell=True, check=True, capture_output=True, text=True)
-        print(f"✅ {description} completed successfully")
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"❌ {description} failed: {e}")
-        print(f"Error output: {e.stderr}")
+    
+    # Stream output instead of buffering it; only the tail is kept for errors
+    tail = deque(maxlen=OUTPUT_TAIL_LINES)
+    proc = await asyncio.create_subprocess_exec(
+        *argv, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT, env=env)
+    async for raw in proc.stdout:
+        line = raw.decode(errors="replace")
+        tail.append(line)
+        if VERBOSE:
+            print(f"   {line}", end="")
+    await proc.wait()
+    
+    if proc.returncode != 0:
+        print(f"❌ {description} failed with exit code {proc.returncode}")
+        print(f"Error output:\n{''.join(tail)}")
         return False
+    
+    print(f"✅ {description} completed successfully")
+    return True
 
 def check_python_version():
     """Check if Python version is compatible"""
-    version = sys.version_info
-    if version.major < 3 or (version.major == 3 and version.minor < 8):
-        print(f"❌ Python 3.8+ required. Current version: {version.major}.{version.minor}")
+    version = sys.version_info[:3]
+    if version < MIN_PYTHON:
+        print(f"❌ Python {'.'.join(map(str, MIN_PYTHON))}+ required. "
+              f"Current version: {version[0]}.{version[1]}")
         return False
-    print(f"✅ Python version {version.major}.{version.minor}.{version.micro} is compatible")
+    print(f"✅ Python version {'.'.join(map(str, version))} is compatible")
     return True
 
-def install_dependencies():
+def missing_packages(packages):
+    """Return the requirement specs not already satisfied by installed packages"""
+    if Requirement is None:
+        # Without packaging the specifiers can't be checked; let pip decide
+        return list(packages)
+    
+    missing = []
+    for spec in packages:
+        req = Requirement(spec)
+        try:
+            installed = metadata.version(req.name)
+        except metadata.PackageNotFoundError:
+            missing.append(spec)
+            continue
+        if not req.specifier.contains(installed, prereleases=True):
+            missing.append(spec)
+    return missing
+
+def browsers_cache_dir():
+    """Return the directory Playwright downloads browsers into"""
+    if os.environ.get("PLAYWRIGHT_BROWSERS_PATH"):
+        return Path(os.environ["PLAYWRIGHT_BROWSERS_PATH"])
+    if sys.platform == "win32":
+        return Path(os.environ.get("LOCALAPPDATA", Path.home())) / "ms-playwright"
+    if sys.platform == "darwin":
+        return Path.home() / "Library" / "Caches" / "ms-playwright"
+    return Path.home() / ".cache" / "ms-playwright"
+
+def dir_entries(path):
+    """Map names to os.DirEntry for one directory listing, or {} if it is missing"""
+    try:
+        with os.scandir(path) as it:
+            return {entry.name: entry for entry in it}
+    except OSError:
+        return {}
+
+def expected_browser_dirs():
+    """Return the browser directories the installed Playwright expects, or None"""
+    spec = importlib.util.find_spec("playwright")
+    if spec is None or not spec.submodule_search_locations:
+        return None
+    
+    # The driver ships the browser revisions it was built against
+    browsers_json = Path(spec.submodule_search_locations[0]) / "driver" / "package" / "browsers.json"
+    try:
+        browsers = json.loads(browsers_json.read_text()).get("browsers", [])
+    except (OSError, ValueError):
+        return None
+    return [f"{b['name'].replace('-', '_')}-{b['revision']}"
+            for b in browsers if b.get("installByDefault")]
+
+def browsers_installed():
+    """Check whether every default Playwright browser is already downloaded"""
+    # One listing of the cache answers every per-browser check
+    names = {name for name, entry in dir_entries(browsers_cache_dir()).items() if entry.is_dir()}
+    if not names:
+        return False
+    
+    expected = expected_browser_dirs()
+    if expected:
+        return set(expected) <= names
+    
+    # Unknown revisions; settle for any downloaded build of each browser
+    return all(any(name.startswith(f"{browser}-") for name in names) for browser in BROWSERS)
+
+def pip_install_argv(packages):
+    """Return the install command and backend name, preferring uv over pip"""
+    uv = shutil.which("uv")
+    if uv:
+        # Point uv at this interpreter so it installs where pip would
+        return [uv, "pip", "install", "--python", sys.executable, *UV_FLAGS, *packages], "uv"
+    return [sys.executable, "-m", "pip", "install", *PIP_FLAGS, *packages], "pip"
+
+async def install_dependencies(packages=None):
     """Install required Python packages"""
-    packages = [
-        "playwright>=1.40.0",
-        "pytest>=7.4.0",
-        "pytest-asyncio>=0.21.0"
-    ]
-    
-    for package in packages:
-        if not run_command(f"pip install {package}", f"Installing {package}"):
-            return False
+    if packages is None:
+        packages = [PLAYWRIGHT_PACKAGE, *TEST_PACKAGES]
     
-    return True
+    packages = missing_packages(packages)
+    if not packages:
+        print("✅ Dependencies already satisfied")
+        return True
+    
+    # One installer run resolves and installs everything in a single pass
+    argv, backend = pip_install_argv(packages)
+    return await run_command(argv, f"Installing dependencies ({backend})",
+                             env={**os.environ, "PIP_DISABLE_PIP_VERSION_CHECK": "1"})
 
-def install_playwright_browsers():
+async def install_playwright_browsers():
     """Install Playwright browser binaries"""
-    return run_command("playwright install", "Installing Playwright browsers")
+    if browsers_installed():
+        print(f"✅ Playwright browsers already installed in {browsers_cache_dir()}")
+        return True
+    
+    # System libraries can only be pulled in on Linux CI hosts
+    argv = [sys.executable, "-m", "playwright", "install"]
+    if sys.platform.startswith("linux") and os.environ.get("CI"):
+        argv.append("--with-deps")
+    return await run_command(argv, "Installing Playwright browsers")
+
+async def install_dependencies_and_browsers():
+    """Install packages and browsers, overlapping the browser download with pip"""
+    # The browser download only needs the playwright CLI, so install it first
+    # and let the remaining packages resolve while the browsers download
+    if not await install_dependencies([PLAYWRIGHT_PACKAGE]):
+        print("❌ Failed to install dependencies")
+        return False
+    
+    deps_ok, browsers_ok = await asyncio.gather(
+        install_dependencies(TEST_PACKAGES), install_playwright_browsers())
+    
+    if not deps_ok:
+        print("❌ Failed to install dependencies")
+    if not browsers_ok:
+        print("❌ Failed to install browsers")
+    return deps_ok and browsers_ok
+
+def write_atomic(path, text):
+    """Write text to a temp file beside path, then swap it into place"""
+    # A unique name per write, so concurrent writers never share a temp file
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.stem}.", suffix=path.suffix)
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(text)
+        os.chmod(tmp, 0o644)  # mkstemp creates owner-only files
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
 
 def create_sample_config():
     """Create a sample configuration file"""
@@ -70,8 +222,7 @@ def create_sample_config():
     }
     
     try:
-        with open('demo_config.json', 'w') as f:
-            json.dump(sample_config, f, indent=2)
+        write_atomic(Path('demo_config.json'), json.dumps(sample_config, indent=2))
         print("✅ Created demo_config.json")
         return True
     except Exception as e:
@@ -80,53 +231,67 @@ def create_sample_config():
 
 def create_requirements_file():
     """Create requirements.txt file"""
-    requirements = """# Smart Automation Model Requirements
-playwright>=1.40.0
-pytest>=7.4.0
-pytest-asyncio>=0.21.0
-"""
-    
+    path = Path('requirements.txt')
     try:
-        with open('requirements.txt', 'w') as f:
-            f.write(requirements)
+        if path.is_file() and path.read_text() == REQUIREMENTS_TXT:
+            print("✅ requirements.txt is up to date")
+            return True
+        write_atomic(path, REQUIREMENTS_TXT)
         print("✅ Created requirements.txt")
         return True
     except Exception as e:
         print(f"❌ Failed to create requirements.txt: {e}")
         return False
 
-def verify_installation():
+def _probe_model_file():
+    """Check that smart_automation_model.py is present"""
+    entry = dir_entries('.').get('smart_automation_model.py')
+    if entry is not None and entry.is_file():
+        return True, None
+    return False, "❌ smart_automation_model.py not found"
+
+def _probe_playwright_import():
+    """Check that playwright can be imported"""
+    try:
+        import playwright
+        return True, "✅ Playwright import successful"
+    except ImportError:
+        return False, "❌ Playwright import failed"
+
+def _probe_playwright_version():
+    """Read the Playwright version from package metadata rather than running the CLI"""
+    try:
+        return True, f"✅ Playwright version: {metadata.version('playwright')}"
+    except metadata.PackageNotFoundError:
+        return False, "❌ Playwright package metadata not found"
+
+async def verify_installation():
     """Verify that everything is installed correctly"""
     print("\n🔍 Verifying installation...")
     
-    # Check if smart_automation_model.py exists
-    if not Path('smart_automation_model.py').exists():
-        print("❌ smart_automation_model.py not found")
-        return False
+    # The probes are independent, so run them side by side
+    loop = asyncio.get_running_loop()
+    results = await asyncio.gather(*(
+        loop.run_in_executor(None, probe)
+        for probe in (_probe_model_file, _probe_playwright_import, _probe_playwright_version)))
     
-    # Try importing playwright
-    try:
-        import playwright
-        print("✅ Playwright import successful")
-    except ImportError:
-        print("❌ Playwright import failed")
-        return False
+    for ok, message in results:
+        if message:
+            print(message)
+    return all(ok for ok, _ in results)
+
+async def _demo_coroutine(config_path="demo_config.json"):
+    """Process the demo test case with the smart automation model"""
+    importlib.invalidate_caches()  # pick up packages installed during setup
+    from smart_automation_model import SmartAutomationModel
     
-    # Check if browsers are installed
+    config = json.loads(Path(config_path).read_text())
     try:
-        result = subprocess.run(["playwright", "--version"], capture_output=True, text=True)
-        if result.returncode == 0:
-            print(f"✅ Playwright version: {result.stdout.strip()}")
-        else:
-            print("❌ Playwright command failed")
-            return False
-    except FileNotFoundError:
-        print("❌ Playwright command not found")
-        return False
-    
-    return True
+        return await SmartAutomationModel().process_test_case(config)
+    finally:
+        await SmartAutomationModel.shutdown()
 
-def run_demo_test():
+async def run_demo_test():
     """Run a demo test to verify everything works"""
     print("\n🚀 Running demo test...")
     
@@ -134,50 +299,51 @@ def run_demo_test():
         print("❌ Demo config not found")
         return False
     
-    # Create a simple test script
-    test_script = '''
-import json
-import asyncio
-from smart_automation_model import SmartAutomationModel
-
-async def run_demo():
-    with open('demo_config.json', 'r') as f:
-        config = json.load(f)
-    
-    model = SmartAutomationModel()
-    results = await model.process_test_case(config)
-    
-    print(f"Demo test status: {results['status']}")
-    return results['status'] == 'completed'
-
-if __name__ == "__main__":
-    success = asyncio.run(run_demo())
-    exit(0 if success else 1)
-'''
-    
+    # Run the model in this process rather than a fresh interpreter
     try:
-        with open('demo_test.py', 'w') as f:
-            f.write(test_script)
+        results = await asyncio.wait_for(_demo_coroutine(), timeout=DEMO_TIMEOUT)
         
-        result = subprocess.run([sys.executable, 'demo_test.py'], 
-                              capture_output=True, text=True, timeout=60)
-        
-        if result.returncode == 0:
+        print(f"Demo test status: {results['status']}")
+        if results['status'] == 'completed':
             print("✅ Demo test completed successfully")
             return True
         else:
-            print(f"❌ Demo test failed: {result.stderr}")
+            print(f"❌ Demo test failed: {results.get('error', results['status'])}")
             return False
             
-    except subprocess.TimeoutExpired:
+    except asyncio.TimeoutError:
         print("❌ Demo test timed out")
         return False
     except Exception as e:
         print(f"❌ Demo test error: {e}")
         return False
 
-def main():
+def parse_args(argv=None):
+    """Parse the setup command line"""
+    parser = argparse.ArgumentParser(description="Set up the Smart Automation Model environment")
+    demo = parser.add_mutually_exclusive_group()
+    demo.add_argument("--run-demo", action="store_true", help="run the demo test without prompting")
+    demo.add_argument("--skip-demo", action="store_true", help="skip the demo test without prompting")
+    return parser.parse_args(argv)
+
+def ask_run_demo():
+    """Ask whether to run the demo test; no answer in time means skip"""
+    print("\n🧪 Would you like to run a demo test? (y/n): ", end="", flush=True)
+    try:
+        # select() can't poll stdin on Windows, so only time out elsewhere
+        if os.name != "nt":
+            ready, _, _ = select.select([sys.stdin], [], [], PROMPT_TIMEOUT)
+            if not ready:
+                print(f"\n⏭️ No answer after {PROMPT_TIMEOUT}s, skipping demo test")
+                return False
+        return input().lower().strip() in ['y', 'yes']
+    except (KeyboardInterrupt, EOFError):
+        print()
+        return False
+
+async def main(argv=None):
     """Main setup function"""
+    args = parse_args(argv)
     print("🤖 Smart Automation Model Setup")
     print("=" * 40)
     
@@ -185,51 +351,39 @@ def main():
     if not check_python_version():
         sys.exit(1)
     
-    # Create requirements file
-    if not create_requirements_file():
-        sys.exit(1)
-    
-    # Install dependencies
-    print("\n📦 Installing dependencies...")
-    if not install_dependencies():
-        print("❌ Failed to install dependencies")
-        sys.exit(1)
-    
-    # Install Playwright browsers
-    print("\n🌐 Installing browsers...")
-    if not install_playwright_browsers():
-        print("❌ Failed to install browsers")
-        sys.exit(1)
+    # Install dependencies and Playwright browsers; the requirements file and
+    # sample configuration don't depend on them, so write those meanwhile
+    print("\n📦 Installing dependencies and browsers...")
+    loop = asyncio.get_running_loop()
+    installed, *written = await asyncio.gather(
+        install_dependencies_and_browsers(),
+        loop.run_in_executor(None, create_requirements_file),
+        loop.run_in_executor(None, create_sample_config))
     
-    # Create sample configuration
-    print("\n📝 Creating sample configuration...")
-    if not create_sample_config():
+    if not (installed and all(written)):
         sys.exit(1)
     
     # Verify installation
-    if not verify_installation():
+    if not await verify_installation():
         print("❌ Installation verification failed")
         sys.exit(1)
     
-    # Run demo test (optional)
-    print("\n🧪 Would you like to run a demo test? (y/n): ", end="")
-    try:
-        response = input().lower().strip()
-        if response in ['y', 'yes']:
-            if run_demo_test():
-                print("\n🎉 Setup completed successfully!")
-            else:
-                print("\n⚠️ Setup completed but demo test failed")
-        else:
-            print("\n✅ Setup completed successfully!")
-    except KeyboardInterrupt:
-        print("\n\n✅ Setup completed successfully!")
+    # Run demo test (optional), without holding up the closing notes
+    run_demo = args.run_demo or (not args.skip_demo and ask_run_demo())
+    demo = asyncio.create_task(run_demo_test()) if run_demo else None
     
     print("\n📚 Next steps:")
     print("1. Edit demo_config.json with your test case")
     print("2. Run: python3 smart_automation_model.py")
     print("3. Check generated files for results")
     print("\n📖 Read SMART_AUTOMATION_GUIDE.md for detailed documentation")
+    
+    if demo is None:
+        print("\n✅ Setup completed successfully!")
+    elif await demo:
+        print("\n🎉 Setup completed successfully!")
+    else:
+        print("\n⚠️ Setup completed but demo test failed")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    asyncio.run(main())
\ No newline at end of file
@@ -8,7 +8,11 @@ import json
 import asyncio
 import re
 import os
+import time
+from collections import defaultdict
 from datetime import datetime
+from functools import lru_cache
+from hashlib import blake2b
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass
 from pathlib import Path
@@ -20,6 +24,539 @@ except ImportError:
     print("Please install playwright: pip install playwright")
     exit(1)
 
+# Optional: Numba-compiled classifier for pages with many elements
+try:
+    import numpy as np
+    from numba import njit
+except ImportError:
+    np = None
+    njit = None
+
+# Optional: faster JSON encoding for the saved page objects and reports
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Optional: Aho-Corasick automaton for the success-indicator scan
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Identifier cleanup patterns, compiled once for every element name
+_NON_ALNUM_RE = re.compile(r'[^a-zA-Z0-9]')
+_UNDERSCORES_RE = re.compile(r'_+')
+
+# FNV-1a over the body markup: any text or structure change yields a new signature
+_PAGE_SIGNATURE_JS = '''
+() => {
+    const html = document.body ? document.body.innerHTML : '';
+    let hash = 0x811c9dc5;
+    for (let i = 0; i < html.length; i++) {
+        hash = Math.imul(hash ^ html.charCodeAt(i), 0x01000193);
+    }
+    return location.href + '|' + document.title + '|' + html.length + '|' + (hash >>> 0).toString(16);
+}
+'''
+
+# Serializes every visible, enabled element matching a selector list in a
+# single evaluate call; hidden or disabled nodes never cross the wire, repeats
+# of an identified node are dropped, and an element that throws while being
+# read is skipped instead of failing the batch
+_ELEMENT_DATA_JS = '''
+    selector => {
+        // SVG nodes expose className/href as objects rather than strings
+        const str = value => typeof value === 'string' ? value : '';
+        const out = [];
+        const seen = new Set();
+        for (const element of document.querySelectorAll(selector)) {
+            try {
+                const rect = element.getBoundingClientRect();
+                const computedStyle = window.getComputedStyle(element);
+                const isVisible = rect.width > 0 && rect.height > 0 && computedStyle.visibility !== 'hidden' && computedStyle.display !== 'none';
+                const isEnabled = !element.disabled && !element.readOnly;
+                if (!isVisible || !isEnabled) continue;
+                
+                // Nodes sharing tag, id, name and data-testid get the same locator,
+                // so only the first is kept; anonymous nodes are never merged
+                const id = element.id || '';
+                const name = str(element.name);
+                const dataTestId = element.getAttribute('data-testid') || '';
+                if (id || name || dataTestId) {
+                    const key = element.tagName + '|' + id + '|' + name + '|' + dataTestId;
+                    if (seen.has(key)) continue;
+                    seen.add(key);
+                }
+                
+                out.push({
+                    tagName: element.tagName.toLowerCase(),
+                    type: str(element.type),
+                    id,
+                    name,
+                    className: str(element.className),
+                    placeholder: element.placeholder || '',
+                    text: element.textContent?.trim() || '',
+                    value: element.value || '',
+                    href: str(element.href),
+                    role: element.getAttribute('role') || '',
+                    ariaLabel: element.getAttribute('aria-label') || '',
+                    dataTestId,
+                    title: str(element.title),
+                    alt: element.alt || '',
+                    boundingBox: {
+                        x: rect.x,
+                        y: rect.y,
+                        width: rect.width,
+                        height: rect.height
+                    },
+                    isVisible,
+                    isEnabled
+                });
+            } catch (e) {
+                // Detached or exotic node; leave it out
+            }
+        }
+        return out;
+    }
+'''
+
+# Rule tables for element classification, built once at import
+_ELEMENT_PATTERNS = {
+    'email': {
+        'selectors': [
+            'input[type="email"]',
+            'input[name*="email" i]',
+            'input[name*="username" i]',
+            'input[name*="user" i]',
+            'input[placeholder*="email" i]',
+            'input[placeholder*="username" i]',
+            'input[id*="email" i]',
+            'input[id*="username" i]',
+            'input[id*="user" i]'
+        ],
+        'keywords': frozenset(['email', 'username', 'user', 'login', 'account', 'signin']),
+        'weight': 0.9
+    },
+    'password': {
+        'selectors': [
+            'input[type="password"]',
+            'input[name*="password" i]',
+            'input[name*="pass" i]',
+            'input[placeholder*="password" i]',
+            'input[id*="password" i]',
+            'input[id*="pass" i]'
+        ],
+        'keywords': frozenset(['password', 'pass', 'pwd', 'secret', 'auth']),
+        'weight': 0.95
+    },
+    'submit': {
+        'selectors': [
+            'button[type="submit"]',
+            'input[type="submit"]',
+            'button:has-text("Sign in")',
+            'button:has-text("Login")',
+            'button:has-text("Log in")',
+            'button:has-text("Submit")',
+            '[data-testid*="login"]',
+            '[data-testid*="signin"]',
+            '[data-testid*="submit"]'
+        ],
+        'keywords': frozenset(['submit', 'login', 'signin', 'sign-in', 'enter', 'go', 'continue']),
+        'weight': 0.85
+    },
+    'link': {
+        'selectors': [
+            'a[href]',
+            '[role="link"]',
+            'button[onclick]'
+        ],
+        'keywords': frozenset(['link', 'href', 'navigate', 'goto', 'click']),
+        'weight': 0.7
+    }
+}
+for _patterns in _ELEMENT_PATTERNS.values():
+    _patterns['keyword_count'] = len(_patterns['keywords'])
+
+# Every bucket's keywords, so each element's text is scanned once per keyword
+_ALL_KEYWORDS = frozenset().union(*(p['keywords'] for p in _ELEMENT_PATTERNS.values()))
+
+# Integer encoding of the rules above for the Numba classifier: one bit per
+# keyword, and element types coded by their bucket's position (1-based)
+_KEYWORD_BITS = {keyword: 1 << bit for bit, keyword in enumerate(sorted(_ALL_KEYWORDS))}
+_BUCKET_TYPES = tuple(_ELEMENT_PATTERNS)
+_TYPE_CODES = {element_type: code for code, element_type in enumerate(_BUCKET_TYPES, 1)}
+_TEXT_TYPE_CODE = _TYPE_CODES['text'] = len(_BUCKET_TYPES) + 1
+_EMAIL_BUCKET = _BUCKET_TYPES.index('email')
+_PASSWORD_BUCKET = _BUCKET_TYPES.index('password')
+_SUBMIT_BUCKET = _BUCKET_TYPES.index('submit')
+_EMAIL_RULE_MASK = _KEYWORD_BITS['email'] | _KEYWORD_BITS['username'] | _KEYWORD_BITS['user']
+_SUBMIT_RULE_MASK = _KEYWORD_BITS['login'] | _KEYWORD_BITS['signin'] | _KEYWORD_BITS['submit']
+
+# Below this many elements the plain Python loop beats JIT dispatch overhead
+_NUMBA_MIN_ELEMENTS = 256
+
+# Pages with fewer elements render faster than a cache lookup pays off
+_PAGE_CLASS_CACHE_MIN_ELEMENTS = 3
+
+# Pages with this many actions get one table-driven dispatcher instead of a method per action
+_PAGE_ACTION_DISPATCH_MIN = 20
+
+# Words on a page after login that suggest the sign-in worked
+_SUCCESS_INDICATORS = ('dashboard', 'welcome', 'home', 'profile', 'logout', 'menu')
+
+if ahocorasick is not None:
+    _SUCCESS_AUTOMATON = ahocorasick.Automaton()
+    for _indicator in _SUCCESS_INDICATORS:
+        _SUCCESS_AUTOMATON.add_word(_indicator, _indicator)
+    _SUCCESS_AUTOMATON.make_automaton()
+
+if njit is not None:
+    _BUCKET_MASKS = np.array([sum(_KEYWORD_BITS[k] for k in p['keywords']) for p in _ELEMENT_PATTERNS.values()],
+                             dtype=np.int64)
+    _BUCKET_COUNTS = np.array([p['keyword_count'] for p in _ELEMENT_PATTERNS.values()], dtype=np.int64)
+    _BUCKET_WEIGHTS = np.array([p['weight'] for p in _ELEMENT_PATTERNS.values()], dtype=np.float64)
+    
+    @njit(cache=True)
+    def _classify_batch(masks, type_codes, is_button, bucket_masks, bucket_counts, weights):
+        """Best bucket index (-1 for none) and confidence per encoded element"""
+        n = len(masks)
+        best_types = np.full(n, -1, dtype=np.int64)
+        best_confidences = np.zeros(n, dtype=np.float64)
+        for i in range(n):
+            mask = masks[i]
+            code = type_codes[i]
+            for b in range(len(bucket_masks)):
+                confidence = 0.0
+                if code == b + 1:
+                    confidence = weights[b]
+                
+                hits = mask & bucket_masks[b]
+                keyword_matches = 0
+                while hits:
+                    hits &= hits - 1
+                    keyword_matches += 1
+                if keyword_matches > 0:
+                    confidence = max(confidence, weights[b] * 0.8 * (keyword_matches / bucket_counts[b]))
+                
+                if b == _EMAIL_BUCKET:
+                    if (code == _EMAIL_BUCKET + 1 or code == _TEXT_TYPE_CODE) and mask & _EMAIL_RULE_MASK:
+                        confidence = max(confidence, 0.9)
+                elif b == _PASSWORD_BUCKET:
+                    if code == _PASSWORD_BUCKET + 1:
+                        confidence = 0.95
+                elif b == _SUBMIT_BUCKET:
+                    if is_button[i] and mask & _SUBMIT_RULE_MASK:
+                        confidence = max(confidence, 0.85)
+                    elif code == _SUBMIT_BUCKET + 1:
+                        confidence = max(confidence, 0.9)
+                
+                if confidence > best_confidences[i]:
+                    best_confidences[i] = confidence
+                    best_types[i] = b
+        return best_types, best_confidences
+
+def _element_text(element_data: Dict[str, Any]) -> str:
+    """Lowercased text of every field the keyword rules look at"""
+    get = element_data.get
+    return (get('text', '') + ' ' + get('placeholder', '') + ' ' + get('name', '') + ' ' +
+            get('id', '') + ' ' + get('className', '') + ' ' + get('ariaLabel', '') + ' ' +
+            get('dataTestId', '')).lower()
+
+# Generated Python script pieces. Templates with fields are filled with
+# str.format (literal braces doubled); the rest are emitted verbatim
+_PY_SCRIPT_HEADER = '''#!/usr/bin/env python3
+"""
+Generated Smart Automation Script with Page Objects
+Generated on: {generated_on}
+Test Case ID: {test_case_id}
+"""
+
+from playwright.async_api import async_playwright
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+from typing import Optional
+from urllib.parse import urlsplit
+
+# Generated Page Object Models
+'''
+
+_PY_TEST_CLASS_HEADER = '''
+class BrowserPool:
+    """Process-wide Playwright browser shared by every test run"""
+    
+    playwright = None
+    browser = None
+    headless = None
+    max_uses_per_instance = 50
+    uses = 0
+    
+    # Slim Chromium profile: no GPU, extensions or background services
+    launch_args = [
+        "--disable-gpu",
+        "--disable-dev-shm-usage",
+        "--disable-extensions",
+        "--disable-background-networking",
+        "--disable-sync",
+        "--disable-translate",
+        "--metrics-recording-only",
+        "--mute-audio",
+        "--no-first-run",
+        "--disable-default-apps",
+        "--disable-features=TranslateUI,BlinkGenPropertyTrees"
+    ]
+    
+    @classmethod
+    async def acquire(cls, headless: bool = False):
+        """Return the shared browser, launching or recycling it as needed"""
+        if cls.browser and (cls.headless != headless or cls.uses >= cls.max_uses_per_instance):
+            await cls.browser.close()
+            cls.browser = None
+        
+        if cls.playwright is None:
+            cls.playwright = await async_playwright().start()
+        
+        if cls.browser is None:
+            cls.browser = await cls.playwright.chromium.launch(headless=headless, args=cls.launch_args)
+            cls.headless = headless
+            cls.uses = 0
+        
+        cls.uses += 1
+        return cls.browser
+    
+    @classmethod
+    async def shutdown(cls):
+        """Close the shared browser and stop Playwright"""
+        if cls.browser:
+            await cls.browser.close()
+            cls.browser = None
+        if cls.playwright:
+            await cls.playwright.stop()
+            cls.playwright = None
+
+
+class SmartTestAutomation:
+    auth_state_ttl = 3600  # Seconds before a saved login session is considered stale
+    login_url = {login_url!r}
+    # Regex searched in the post-login URL path; None accepts any URL other than login_url
+    login_success_path = {login_success_path!r}
+    context_options = {{"reduced_motion": "reduce", "bypass_csp": False}}
+    
+    def __init__(self, headless: bool = {headless}, force_login: bool = False):
+        self.headless = headless
+        self.force_login = force_login
+        self.test_case_id = "{test_case_id}"
+        self.state_path = f".auth/{{self.test_case_id}}.json"
+        self.authenticated = False
+        self.login_verified = False
+        self.context = None
+        self.page = None
+        
+        # Initialize page objects
+'''
+
+_PY_SETUP_HEADER = '''
+    
+    async def setup(self):
+        """Setup browser context and page objects"""
+        browser = await BrowserPool.acquire(self.headless)
+        
+        # Reuse a fresh saved session so the login steps can be skipped
+        state_fresh = (os.path.exists(self.state_path) and
+                       time.time() - os.path.getmtime(self.state_path) < self.auth_state_ttl)
+        if state_fresh and not self.force_login:
+            self.context = await browser.new_context(storage_state=self.state_path, **self.context_options)
+            self.authenticated = True
+        else:
+            self.context = await browser.new_context(**self.context_options)
+        
+        # Ambient waits fail fast; page loads keep the regular navigation budget
+        self.context.set_default_timeout(5000)
+        self.context.set_default_navigation_timeout(30000)
+        self.page = await self.context.new_page()
+        
+        # Initialize page objects with page instance
+'''
+
+_PY_RUN_TEST_HEADER = '''
+    
+    async def run_test(self):
+        """Execute the generated test case"""
+        try:
+            await self.setup()
+            
+            # Test execution based on smart detection
+'''
+
+_PY_RUN_TEST_FOOTER = '''
+            # Only a session that passed the logged-in check is cached for later runs
+            if not self.authenticated and self.login_verified:
+                await self.save_auth_state()
+            
+            print("✅ Test completed successfully")
+            return True
+            
+        except Exception as e:
+            print(f"❌ Test failed: {e}")
+            return False
+            
+        finally:
+            await self.cleanup()
+    
+    async def verify_logged_in(self):
+        """Wait for the post-login page; a failed check drops the cached session"""
+        if self.login_success_path:
+            pattern = re.compile(self.login_success_path)
+            logged_in = lambda url: pattern.search(urlsplit(url).path) is not None
+        else:
+            logged_in = lambda url: url.rstrip('/') != self.login_url.rstrip('/')
+        try:
+            await self.page.wait_for_url(logged_in, timeout=15000)
+        except Exception:
+            if os.path.exists(self.state_path):
+                os.remove(self.state_path)
+            raise
+        self.login_verified = True
+    
+    async def save_auth_state(self):
+        """Persist cookies and localStorage for later runs"""
+        os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        await self.context.storage_state(path=self.state_path)
+    
+    async def cleanup(self):
+        """Close this test's context; the pooled browser stays alive"""
+        if self.context:
+            await self.context.close()
+            self.context = None
+
+async def main():
+    """Main execution function"""
+    try:
+        test = SmartTestAutomation(force_login="--force-login" in sys.argv)
+        success = await test.run_test()
+    finally:
+        await BrowserPool.shutdown()
+    return success
+
+if __name__ == "__main__":
+    result = asyncio.run(main())
+    exit(0 if result else 1)
+'''
+
+_PY_PAGE_CLASS_HEADER = '''
+class {page_name}Page:
+    """Smart Page Object for {page_name}"""
+    
+    def __init__(self, page):
+        self.page = page
+        self.url_pattern = "{url_pattern}"
+        
+        # Smart-detected element locators (with confidence scores)
+        self._locators = {{
+'''
+
+_PY_LOCATOR_LINE = "            \"{name}\": page.locator('{selector}'),  # Confidence: {confidence:.2f}\n"
+
+_PY_FILL_METHOD = '''
+    async def {method_name}(self, value: str):
+        """Fill {element_name} field"""
+        await self._locators["{element_name}"].fill(value)
+'''
+
+_PY_CLICK_METHOD = '''
+    async def {method_name}(self):
+        """Click {element_name} element"""
+        await self._locators["{element_name}"].click()
+'''
+
+_PY_ACTION_TABLE_HEADER = '''
+    # Action name -> (kind, element) for the shared dispatcher
+    _ACTIONS = {
+'''
+
+_PY_ACTION_TABLE_LINE = '        "{method_name}": ("{kind}", "{element_name}"),\n'
+
+_PY_ACTION_DISPATCHER = '''    }
+    
+    async def do(self, name: str, value: str = None):
+        """Fill or click the element behind a generated action"""
+        kind, element_name = self._ACTIONS[name]
+        locator = self._locators[element_name]
+        return await (locator.fill(value) if kind == "fill" else locator.click())
+    
+    def __getattr__(self, name):
+        # Generated action names stay callable, e.g. await page.fill_email(value)
+        if name in self._ACTIONS:
+            return lambda value=None: self.do(name, value)
+        raise AttributeError(name)
+'''
+
+_PY_FILL_CREDENTIALS = '''
+    async def fill_credentials(self, username: str, password: str):
+        """Fill username and password fields; fills on one page must not overlap"""
+        await self.{email_method}(username)
+        await self.{password_method}(password)
+'''
+
+@lru_cache(maxsize=1024)
+def _parse_action(action: str) -> Tuple[Optional[str], str, Optional[str]]:
+    """Split an action like 'fill_email(username: str)' into (kind, method name, element name)"""
+    method_name = action.split('(')[0]
+    if 'fill_' in method_name:
+        return 'fill', method_name, method_name.replace('fill_', '')
+    if 'click_' in method_name:
+        return 'click', method_name, method_name.replace('click_', '')
+    return None, method_name, None
+
+def _file_timestamp() -> str:
+    """Local time as used in generated file names"""
+    return time.strftime("%Y%m%d_%H%M%S")
+
+def _write_bytes(path: str, data: bytes):
+    """Write bytes straight to an unbuffered fd"""
+    data = memoryview(data)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        # os.write may write fewer bytes than asked for
+        while data:
+            data = data[os.write(fd, data):]
+    finally:
+        os.close(fd)
+
+def _write_text(path: str, text: str):
+    """Write a generated text file as UTF-8"""
+    _write_bytes(path, text.encode('utf-8'))
+
+def _encode_json(data: Any) -> bytes:
+    """Encode data as indented JSON, by orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2).encode('utf-8')
+
+def _write_json(path: str, data: Any):
+    """Write data as indented JSON"""
+    _write_bytes(path, _encode_json(data))
+
+# Digest -> absolute path of the saved file holding that content
+_OUTPUT_CACHE_DIR = Path('.smart_cache')
+
+def _previous_output(digest: str) -> Optional[str]:
+    """Saved file with this content digest, if it is still on disk"""
+    try:
+        path = (_OUTPUT_CACHE_DIR / digest).read_text()
+    except OSError:
+        return None
+    return path if os.path.exists(path) else None
+
+def _remember_output(digest: str, path: str):
+    """Record which file holds the content with this digest"""
+    _OUTPUT_CACHE_DIR.mkdir(exist_ok=True)
+    (_OUTPUT_CACHE_DIR / digest).write_text(os.path.abspath(path))
+
 @dataclass
 class ElementInfo:
     """Information about a detected web element"""
@@ -41,97 +578,59 @@ class PageObject:
 class SmartElementDetector:
     """Smart element detection using rule-based AI"""
     
-    def __init__(self):
-        self.element_patterns = {
-            'email': {
-                'selectors': [
-                    'input[type="email"]',
-                    'input[name*="email" i]',
-                    'input[name*="username" i]',
-                    'input[name*="user" i]',
-                    'input[placeholder*="email" i]',
-                    'input[placeholder*="username" i]',
-                    'input[id*="email" i]',
-                    'input[id*="username" i]',
-                    'input[id*="user" i]'
-                ],
-                'keywords': ['email', 'username', 'user', 'login', 'account', 'signin'],
-                'weight': 0.9
-            },
-            'password': {
-                'selectors': [
-                    'input[type="password"]',
-                    'input[name*="password" i]',
-                    'input[name*="pass" i]',
-                    'input[placeholder*="password" i]',
-                    'input[id*="password" i]',
-                    'input[id*="pass" i]'
-                ],
-                'keywords': ['password', 'pass', 'pwd', 'secret', 'auth'],
-                'weight': 0.95
-            },
-            'submit': {
-                'selectors': [
-                    'button[type="submit"]',
-                    'input[type="submit"]',
-                    'button:has-text("Sign in")',
-                    'button:has-text("Login")',
-                    'button:has-text("Log in")',
-                    'button:has-text("Submit")',
-                    '[data-testid*="login"]',
-                    '[data-testid*="signin"]',
-                    '[data-testid*="submit"]'
-                ],
-                'keywords': ['submit', 'login', 'signin', 'sign-in', 'enter', 'go', 'continue'],
-                'weight': 0.85
-            },
-            'link': {
-                'selectors': [
-                    'a[href]',
-                    '[role="link"]',
-                    'button[onclick]'
-                ],
-                'keywords': ['link', 'href', 'navigate', 'goto', 'click'],
-                'weight': 0.7
-            }
-        }
+    element_patterns = _ELEMENT_PATTERNS
     
-    def classify_element(self, element_data: Dict[str, Any]) -> Tuple[str, float]:
+    @staticmethod
+    def classify_element(element_data: Dict[str, Any]) -> Tuple[str, float]:
         """Classify element type using smart rule-based detection"""
+        # Check if element matches type-specific selectors
+        elem_type = element_data.get('type', '').lower()
+        
+        # A direct password/email type already scores above every other bucket
+        if elem_type == 'password':
+            return 'password', 0.95
+        if elem_type == 'email':
+            return 'email', 0.9
+        
+        # Get all text content for analysis
+        return SmartElementDetector._classify_features(
+            elem_type, element_data.get('tagName', '').lower(), _element_text(element_data))
+    
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _classify_features(elem_type: str, tag_name: str, text_content: str) -> Tuple[str, float]:
+        """Score the lowercased type, tag and text; look-alike elements hit the cache"""
         best_type = 'other'
         best_confidence = 0.0
         
-        # Get all text content for analysis
-        text_content = ' '.join([
-            element_data.get('text', ''),
-            element_data.get('placeholder', ''),
-            element_data.get('name', ''),
-            element_data.get('id', ''),
-            element_data.get('className', ''),
-            element_data.get('ariaLabel', ''),
-            element_data.get('dataTestId', '')
-        ]).lower()
-        
-        for element_type, patterns in self.element_patterns.items():
+        # No type and no text in any field leaves nothing for the rules to match
+        if not elem_type and not text_content.strip():
+            return best_type, best_confidence
+        
+        # Keywords present in the text; buckets and special rules intersect with this
+        found_keywords = {keyword for keyword in _ALL_KEYWORDS if keyword in text_content}
+        
+        # Submit inputs win outright too; keyworded buttons keep the button score
+        if elem_type == 'submit':
+            if tag_name == 'button' and not found_keywords.isdisjoint(('login', 'signin', 'submit')):
+                return 'submit', 0.85
+            return 'submit', 0.9
+        
+        for element_type, patterns in _ELEMENT_PATTERNS.items():
             confidence = 0.0
             
-            # Check if element matches type-specific selectors
-            elem_type = element_data.get('type', '').lower()
-            tag_name = element_data.get('tagName', '').lower()
-            
             # Direct type match (highest confidence)
             if elem_type == element_type:
                 confidence = patterns['weight']
             
             # Keyword matching in text content
-            keyword_matches = sum(1 for keyword in patterns['keywords'] 
-                                if keyword in text_content)
+            keyword_matches = len(found_keywords & patterns['keywords'])
             if keyword_matches > 0:
-                confidence = max(confidence, patterns['weight'] * 0.8 * (keyword_matches / len(patterns['keywords'])))
+                confidence = max(confidence, patterns['weight'] * 0.8 * (keyword_matches / patterns['keyword_count']))
             
             # Special rules for better detection
             if element_type == 'email':
-                if elem_type in ['email', 'text'] and any(kw in text_content for kw in ['email', 'username', 'user']):
+                if elem_type in ['email', 'text'] and not found_keywords.isdisjoint(('email', 'username', 'user')):
                     confidence = max(confidence, 0.9)
             
             elif element_type == 'password':
@@ -139,7 +638,7 @@ class SmartElementDetector:
                     confidence = 0.95
             
             elif element_type == 'submit':
-                if tag_name == 'button' and any(kw in text_content for kw in ['login', 'signin', 'submit']):
+                if tag_name == 'button' and not found_keywords.isdisjoint(('login', 'signin', 'submit')):
                     confidence = max(confidence, 0.85)
                 elif elem_type == 'submit':
                     confidence = max(confidence, 0.9)
@@ -150,13 +649,30 @@ class SmartElementDetector:
                 best_type = element_type
         
         return best_type, best_confidence
+    
+    @staticmethod
+    def classify_batch(batch: List[Dict[str, Any]]) -> List[Tuple[str, float]]:
+        """Classify many elements at once, using the Numba kernel for large pages"""
+        if njit is None or len(batch) < _NUMBA_MIN_ELEMENTS:
+            return [SmartElementDetector.classify_element(element_data) for element_data in batch]
+        
+        masks = np.empty(len(batch), dtype=np.int64)
+        type_codes = np.empty(len(batch), dtype=np.int64)
+        is_button = np.empty(len(batch), dtype=np.bool_)
+        for i, element_data in enumerate(batch):
+            text_content = _element_text(element_data)
+            masks[i] = sum(bit for keyword, bit in _KEYWORD_BITS.items() if keyword in text_content)
+            type_codes[i] = _TYPE_CODES.get(element_data.get('type', '').lower(), 0)
+            is_button[i] = element_data.get('tagName', '').lower() == 'button'
+        
+        best_types, best_confidences = _classify_batch(
+            masks, type_codes, is_button, _BUCKET_MASKS, _BUCKET_COUNTS, _BUCKET_WEIGHTS)
+        return [(_BUCKET_TYPES[t] if t >= 0 else 'other', float(c))
+                for t, c in zip(best_types, best_confidences)]
 
 class SmartPageObjectGenerator:
     """Generate Page Object Models from web pages using smart detection"""
     
-    def __init__(self):
-        self.detector = SmartElementDetector()
-    
     async def analyze_page(self, page: Page, url: str) -> PageObject:
         """Analyze a web page and generate page object model"""
         print(f"🔍 Analyzing page: {url}")
@@ -203,124 +719,71 @@ class SmartPageObjectGenerator:
             '.signin'
         ]
         
-        for selector in selectors:
-            try:
-                element_handles = await page.query_selector_all(selector)
-                
-                for i, handle in enumerate(element_handles):
-                    try:
-                        # Get element properties
-                        element_data = await self._get_element_data(handle)
-                        
-                        if not element_data or not element_data.get('isVisible'):
-                            continue
-                        
-                        # Classify element using smart detection
-                        element_type, confidence = self.detector.classify_element(element_data)
-                        
-                        # Skip low-confidence detections
-                        if confidence < 0.3:
-                            continue
-                        
-                        # Generate unique element name
-                        element_name = self._generate_element_name(element_type, element_data, i)
-                        
-                        # Avoid duplicates
-                        if element_name in elements:
-                            element_name = f"{element_name}_{i}"
-                        
-                        # Create ElementInfo
-                        elements[element_name] = ElementInfo(
-                            selector=self._generate_robust_selector(element_data),
-                            element_type=element_type,
-                            confidence=confidence,
-                            attributes=element_data,
-                            text_content=element_data.get('text', ''),
-                            position=self._extract_position(element_data.get('boundingBox', {}))
-                        )
-                        
-                    except Exception as e:
-                        print(f"Warning: Could not process element {i}: {e}")
-                        continue
-                        
-            except Exception as e:
-                print(f"Warning: Could not query selector {selector}: {e}")
-                continue
-        
-        return elements
-    
-    async def _get_element_data(self, handle) -> Dict[str, Any]:
-        """Extract comprehensive data from an element handle"""
+        # One query over the union of all selectors returns each DOM node once,
+        # serialized in the same browser round-trip
         try:
-            data = await handle.evaluate('''
-                element => {
-                    const rect = element.getBoundingClientRect();
-                    const computedStyle = window.getComputedStyle(element);
-                    return {
-                        tagName: element.tagName.toLowerCase(),
-                        type: element.type || '',
-                        id: element.id || '',
-                        name: element.name || '',
-                        className: element.className || '',
-                        placeholder: element.placeholder || '',
-                        text: element.textContent?.trim() || '',
-                        value: element.value || '',
-                        href: element.href || '',
-                        role: element.getAttribute('role') || '',
-                        ariaLabel: element.getAttribute('aria-label') || '',
-                        dataTestId: element.getAttribute('data-testid') || '',
-                        title: element.title || '',
-                        alt: element.alt || '',
-                        boundingBox: {
-                            x: rect.x,
-                            y: rect.y,
-                            width: rect.width,
-                            height: rect.height
-                        },
-                        isVisible: rect.width > 0 && rect.height > 0 && computedStyle.visibility !== 'hidden' && computedStyle.display !== 'none',
-                        isEnabled: !element.disabled && !element.readOnly
-                    };
-                }
-            ''')
+            batch = await page.evaluate(_ELEMENT_DATA_JS, ','.join(selectors))
+        except Exception as e:
+            print(f"Warning: Could not query elements: {e}")
+            return elements
+        
+        # Classify elements using smart detection
+        classifications = SmartElementDetector.classify_batch(batch)
+        
+        for i, (element_data, (element_type, confidence)) in enumerate(zip(batch, classifications)):
+            # Skip low-confidence detections
+            if confidence < 0.3:
+                continue
             
-            return data if data.get('isVisible') and data.get('isEnabled') else None
+            # Generate unique element name
+            element_name = self._generate_element_name(element_type, element_data, i)
             
-        except Exception as e:
-            print(f"Error extracting element data: {e}")
-            return None
+            # Avoid duplicates
+            if element_name in elements:
+                element_name = f"{element_name}_{i}"
+            
+            # Create ElementInfo; the serializer always fills in all four box fields
+            bbox = element_data['boundingBox']
+            elements[element_name] = ElementInfo(
+                selector=self._generate_robust_selector(element_data),
+                element_type=element_type,
+                confidence=confidence,
+                attributes=element_data,
+                text_content=element_data.get('text', ''),
+                position=(int(bbox['x']), int(bbox['y']), int(bbox['width']), int(bbox['height']))
+            )
+        
+        return elements
     
     def _generate_robust_selector(self, element_data: Dict[str, Any]) -> str:
         """Generate the most robust CSS selector for an element"""
-        selectors = []
+        # Priority order: data-testid > id > name > type + attributes > class;
+        # the first attribute present wins, so later candidates are never built
+        if test_id := element_data.get('dataTestId'):
+            return f'[data-testid="{test_id}"]'
         
-        # Priority order: data-testid > id > name > type + attributes > class
-        if element_data.get('dataTestId'):
-            selectors.append(f'[data-testid="{element_data["dataTestId"]}"]')
+        if element_id := element_data.get('id'):
+            return f'#{element_id}'
         
-        if element_data.get('id'):
-            selectors.append(f'#{element_data["id"]}')
+        if name := element_data.get('name'):
+            return f'[name="{name}"]'
         
-        if element_data.get('name'):
-            selectors.append(f'[name="{element_data["name"]}"]')
-        
-        if element_data.get('type'):
-            selectors.append(f'{element_data["tagName"]}[type="{element_data["type"]}"]')
+        if elem_type := element_data.get('type'):
+            return f'{element_data["tagName"]}[type="{elem_type}"]'
         
         # Fallback to tag name with class (first 2 classes only)
         if element_data.get('className'):
             classes = element_data['className'].split()[:2]
             if classes:
-                class_selector = '.'.join(classes)
-                selectors.append(f'{element_data["tagName"]}.{class_selector}')
+                return f'{element_data["tagName"]}.{".".join(classes)}'
         
         # Text-based selector for buttons/links
         if element_data.get('text') and len(element_data['text']) < 50:
-            clean_text = element_data['text'].replace('"', '\\"')
             if element_data['tagName'] in ['button', 'a']:
-                selectors.append(f'{element_data["tagName"]}:has-text("{clean_text}")')
+                clean_text = element_data['text'].replace('"', '\\"')
+                return f'{element_data["tagName"]}:has-text("{clean_text}")'
         
-        # Return the first (most specific) selector
-        return selectors[0] if selectors else element_data.get('tagName', 'unknown')
+        return element_data.get('tagName', 'unknown')
     
     def _generate_element_name(self, element_type: str, element_data: Dict[str, Any], index: int) -> str:
         """Generate a meaningful name for the element"""
@@ -338,22 +801,13 @@ class SmartPageObjectGenerator:
         
         # Use text content for buttons/links
         if element_data.get('text') and len(element_data['text']) < 30:
-            clean_text = re.sub(r'[^a-zA-Z0-9]', '_', element_data['text']).strip('_')
+            clean_text = _NON_ALNUM_RE.sub('_', element_data['text']).strip('_')
             if clean_text:
                 return f"{element_type}_{clean_text}"
         
         # Fallback to type + index
         return f"{element_type}_{index}"
     
-    def _extract_position(self, bbox: Dict[str, float]) -> Tuple[int, int, int, int]:
-        """Extract position tuple from bounding box"""
-        return (
-            int(bbox.get('x', 0)),
-            int(bbox.get('y', 0)),
-            int(bbox.get('width', 0)),
-            int(bbox.get('height', 0))
-        )
-    
     def _generate_actions(self, elements: Dict[str, ElementInfo]) -> List[str]:
         """Generate possible actions based on detected elements"""
         actions = []
@@ -373,8 +827,7 @@ class SmartPageObjectGenerator:
     def _sanitize_name(self, name: str) -> str:
         """Sanitize name for use as identifier"""
         # Remove special characters and convert to camelCase
-        clean_name = re.sub(r'[^a-zA-Z0-9]', '_', name)
-        clean_name = re.sub(r'_+', '_', clean_name).strip('_')
+        clean_name = _UNDERSCORES_RE.sub('_', _NON_ALNUM_RE.sub('_', name)).strip('_')
         return clean_name if clean_name else 'element'
     
     def _extract_url_pattern(self, url: str) -> str:
@@ -384,7 +837,14 @@ class SmartPageObjectGenerator:
         return base_url
 
 class SmartAutomationModel:
-    """Main automation model with smart element detection"""
+    """Main automation model with smart element detection
+    
+    Browsers outlive process_test_case; call `await SmartAutomationModel.shutdown()` before the event loop exits.
+    """
+    
+    # Browsers shared across the process; each test case gets its own context
+    _playwright = None
+    _browser_pool: Dict[bool, Browser] = {}  # Shared browsers keyed by headless mode
     
     def __init__(self):
         self.page_generator = SmartPageObjectGenerator()
@@ -392,6 +852,10 @@ class SmartAutomationModel:
         self.context: Optional[BrowserContext] = None
         self.page: Optional[Page] = None
         self.page_objects: Dict[str, PageObject] = {}
+        self._analysis_cache: Dict[str, PageObject] = {}
+        self._type_index: Dict[str, List[Tuple[str, ElementInfo]]] = defaultdict(list)
+        self._best_by_type: Dict[str, Tuple[str, ElementInfo]] = {}
+        self._pending_screenshot: Optional[asyncio.Task] = None
         
     async def process_test_case(self, test_config: Dict[str, Any]) -> Dict[str, Any]:
         """Process a test case and generate automation script"""
@@ -436,8 +900,15 @@ class SmartAutomationModel:
     
     async def _initialize_browser(self, headless: bool = False):
         """Initialize Playwright browser"""
-        playwright = await async_playwright().start()
-        self.browser = await playwright.chromium.launch(headless=headless)
+        cls = type(self)
+        if cls._playwright is None:
+            cls._playwright = await async_playwright().start()
+        
+        self.browser = cls._browser_pool.get(headless)
+        if self.browser is None:
+            self.browser = await cls._playwright.chromium.launch(headless=headless)
+            cls._browser_pool[headless] = self.browser
+        
         self.context = await self.browser.new_context()
         self.page = await self.context.new_page()
         
@@ -453,6 +924,9 @@ class SmartAutomationModel:
             print(f"\n🔄 Step {i}: {step}")
             results['execution_log'].append(f"Step {i}: {step}")
             
+            # The previous step's screenshot must show its page, not this step's actions
+            await self._finish_screenshot()
+            
             try:
                 if "navigate" in step.lower() or "url" in step.lower():
                     await self._smart_navigate(test_data.get('url'), results)
@@ -469,18 +943,34 @@ class SmartAutomationModel:
                 elif "verify" in step.lower() or "dashboard" in step.lower():
                     await self._smart_verify_success(results)
                 
-                # Take screenshot after each step
-                screenshot_path = f"step_{i}_screenshot.png"
-                await self.page.screenshot(path=screenshot_path)
-                results['screenshots'].append(screenshot_path)
-                
-                # Analyze current page and update page objects
+                # Capture in the background (JPEG encodes faster than PNG) while the
+                # page is re-analyzed; it is awaited before the next step acts
+                self._pending_screenshot = asyncio.create_task(
+                    self._capture_screenshot(f"step_{i}_screenshot.jpg", results))
                 await self._analyze_current_page(results)
                 
             except Exception as e:
                 error_msg = f"Step {i} failed: {str(e)}"
                 results['execution_log'].append(error_msg)
                 print(f"⚠️ {error_msg}")
+        
+        # The report lists only screenshots that were actually written
+        await self._finish_screenshot()
+    
+    async def _capture_screenshot(self, path: str, results: Dict[str, Any]):
+        """Take a step screenshot, recording its path only once the capture succeeded"""
+        try:
+            await self.page.screenshot(path=path, type='jpeg', quality=70)
+        except Exception as e:
+            print(f"⚠️ Screenshot failed: {e}")
+            return
+        results['screenshots'].append(path)
+    
+    async def _finish_screenshot(self):
+        """Wait for the in-flight step screenshot, if any"""
+        if self._pending_screenshot:
+            await self._pending_screenshot
+            self._pending_screenshot = None
     
     async def _smart_navigate(self, url: str, results: Dict[str, Any]):
         """Navigate with smart page analysis"""
@@ -489,21 +979,20 @@ class SmartAutomationModel:
         await self.page.wait_for_load_state('networkidle')
         
         # Analyze the landing page
-        page_obj = await self.page_generator.analyze_page(self.page, url)
-        self.page_objects[page_obj.page_name] = page_obj
+        page_obj = await self._analyze_page_cached(url)
+        self._store_page_object(page_obj)
         results['page_objects'][page_obj.page_name] = self._serialize_page_object(page_obj)
         
         print(f"  ✅ Page analyzed: {page_obj.page_name} ({len(page_obj.elements)} elements detected)")
     
     async def _smart_fill_email(self, username: str, results: Dict[str, Any]):
         """Fill email using smart-detected elements"""
-        email_elements = self._find_elements_by_type('email')
+        # Use the highest confidence email element
+        best_element = self._best_element('email')
         
-        if not email_elements:
+        if best_element is None:
             raise Exception("No email field detected by smart model")
         
-        # Use the highest confidence email element
-        best_element = max(email_elements, key=lambda x: x[1].confidence)
         element_name, element_info = best_element
         
         print(f"  → Filling email field: {element_name} (confidence: {element_info.confidence:.2f})")
@@ -512,13 +1001,12 @@ class SmartAutomationModel:
     
     async def _smart_fill_password(self, password: str, results: Dict[str, Any]):
         """Fill password using smart-detected elements"""
-        password_elements = self._find_elements_by_type('password')
+        # Use the highest confidence password element
+        best_element = self._best_element('password')
         
-        if not password_elements:
+        if best_element is None:
             raise Exception("No password field detected by smart model")
         
-        # Use the highest confidence password element
-        best_element = max(password_elements, key=lambda x: x[1].confidence)
         element_name, element_info = best_element
         
         print(f"  → Filling password field: {element_name} (confidence: {element_info.confidence:.2f})")
@@ -527,13 +1015,12 @@ class SmartAutomationModel:
     
     async def _smart_click_submit(self, results: Dict[str, Any]):
         """Click submit using smart-detected elements"""
-        submit_elements = self._find_elements_by_type('submit')
+        # Use the highest confidence submit element
+        best_element = self._best_element('submit')
         
-        if not submit_elements:
+        if best_element is None:
             raise Exception("No submit button detected by smart model")
         
-        # Use the highest confidence submit element
-        best_element = max(submit_elements, key=lambda x: x[1].confidence)
         element_name, element_info = best_element
         
         print(f"  → Clicking submit button: {element_name} (confidence: {element_info.confidence:.2f})")
@@ -547,40 +1034,68 @@ class SmartAutomationModel:
         print(f"  → Current URL: {current_url}")
         
         # Analyze the current page for success indicators
-        page_obj = await self.page_generator.analyze_page(self.page, current_url)
+        page_obj = await self._analyze_page_cached(current_url)
         
-        # Look for dashboard/success indicators
-        success_indicators = ['dashboard', 'welcome', 'home', 'profile', 'logout', 'menu']
+        # Look for dashboard/success indicators; one entry per distinct indicator hit
         found_indicators = []
         
         for element_name, element_info in page_obj.elements.items():
-            for indicator in success_indicators:
-                if indicator in element_name.lower() or indicator in element_info.text_content.lower():
-                    found_indicators.append(f"{element_name}: {element_info.text_content}")
+            # The separator keeps a match from spanning the name and the text
+            haystack = element_name.lower() + '\x00' + element_info.text_content.lower()
+            if ahocorasick is not None:
+                hits = {indicator for _, indicator in _SUCCESS_AUTOMATON.iter(haystack)}
+            else:
+                hits = [indicator for indicator in _SUCCESS_INDICATORS if indicator in haystack]
+            found_indicators.extend([f"{element_name}: {element_info.text_content}"] * len(hits))
         
         if found_indicators:
             print(f"  ✅ Success verified - Found indicators: {', '.join(found_indicators[:3])}")
         else:
             print(f"  ⚠️ Success verification inconclusive - proceeding")
     
+    def _store_page_object(self, page_obj: PageObject):
+        """Store a page object and index its elements by type"""
+        replaced = page_obj.page_name in self.page_objects
+        self.page_objects[page_obj.page_name] = page_obj
+        self._best_by_type.clear()
+        
+        # A replaced page keeps its slot, so reindex everything in page order
+        if replaced:
+            self._type_index.clear()
+        for stored in (self.page_objects.values() if replaced else [page_obj]):
+            for name, element_info in stored.elements.items():
+                self._type_index[element_info.element_type].append((name, element_info))
+    
     def _find_elements_by_type(self, element_type: str) -> List[Tuple[str, ElementInfo]]:
         """Find elements of a specific type across all page objects"""
-        elements = []
-        
-        for page_obj in self.page_objects.values():
-            for name, element_info in page_obj.elements.items():
-                if element_info.element_type == element_type:
-                    elements.append((name, element_info))
-        
-        return elements
+        return self._type_index.get(element_type, [])
+    
+    def _best_element(self, element_type: str) -> Optional[Tuple[str, ElementInfo]]:
+        """Return the highest confidence element of a type, or None"""
+        if element_type not in self._best_by_type:
+            elements = self._find_elements_by_type(element_type)
+            if not elements:
+                return None
+            self._best_by_type[element_type] = max(elements, key=lambda x: x[1].confidence)
+        return self._best_by_type[element_type]
+    
+    async def _analyze_page_cached(self, url: str) -> PageObject:
+        """Analyze the current page, reusing the result while its DOM is unchanged"""
+        # URL, title and a hash of the body markup stand in for "same page, same DOM"
+        signature = await self.page.evaluate(_PAGE_SIGNATURE_JS)
+        page_obj = self._analysis_cache.get(signature)
+        if page_obj is None:
+            page_obj = await self.page_generator.analyze_page(self.page, url)
+            self._analysis_cache[signature] = page_obj
+        return page_obj
     
     async def _analyze_current_page(self, results: Dict[str, Any]):
         """Analyze current page and update page objects"""
         current_url = self.page.url
-        page_obj = await self.page_generator.analyze_page(self.page, current_url)
+        page_obj = await self._analyze_page_cached(current_url)
         
         if page_obj.page_name not in self.page_objects:
-            self.page_objects[page_obj.page_name] = page_obj
+            self._store_page_object(page_obj)
             results['page_objects'][page_obj.page_name] = self._serialize_page_object(page_obj)
     
     def _serialize_page_object(self, page_obj: PageObject) -> Dict[str, Any]:
@@ -603,194 +1118,168 @@ class SmartAutomationModel:
     
     async def _generate_automation_script(self, test_config: Dict[str, Any], results: Dict[str, Any]) -> str:
         """Generate comprehensive automation script with page objects"""
-        script_template = f'''#!/usr/bin/env python3
-"""
-Generated Smart Automation Script with Page Objects
-Generated on: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
-Test Case ID: {test_config.get('test_case_id')}
-"""
-
-from playwright.async_api import async_playwright
-import asyncio
-import json
-from typing import Optional
-
-# Generated Page Object Models
-'''
+        parts = [_PY_SCRIPT_HEADER.format(generated_on=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                                          test_case_id=test_config.get('test_case_id'))]
         
-        # Generate page object classes
+        # One pass over the page objects emits each class together with the
+        # attribute declaration and setup line that use it
+        declarations = []
+        initializations = []
         for page_name, page_data in results['page_objects'].items():
-            script_template += self._generate_page_object_class(page_name, page_data)
+            parts.append(self._generate_page_object_class(page_name, page_data))
+            attribute = f"        self.{page_name.lower()}_page"
+            declarations.append(f"{attribute} = None\n")
+            initializations.append(f"{attribute} = {page_name}Page(self.page)\n")
         
-        # Generate main test class
-        script_template += f'''
-class SmartTestAutomation:
-    def __init__(self, headless: bool = {test_config.get('headless', False)}):
-        self.headless = headless
-        self.browser = None
-        self.context = None
-        self.page = None
-        
-        # Initialize page objects
-'''
-        
-        for page_name in results['page_objects'].keys():
-            script_template += f"        self.{page_name.lower()}_page = None\n"
-        
-        script_template += '''
-    
-    async def setup(self):
-        """Setup browser and page objects"""
-        playwright = await async_playwright().start()
-        self.browser = await playwright.chromium.launch(headless=self.headless)
-        self.context = await self.browser.new_context()
-        self.page = await self.context.new_page()
-        
-        # Initialize page objects with page instance
-'''
-        
-        for page_name in results['page_objects'].keys():
-            script_template += f"        self.{page_name.lower()}_page = {page_name}Page(self.page)\n"
+        # Generate shared browser pool and main test class
+        test_data = test_config.get('test_data', {})
+        parts.append(_PY_TEST_CLASS_HEADER.format(headless=test_config.get('headless', False),
+                                                  test_case_id=test_config.get('test_case_id'),
+                                                  login_url=test_data.get('url', ''),
+                                                  login_success_path=test_data.get('login_success_path')))
+        parts.extend(declarations)
+        parts.append(_PY_SETUP_HEADER)
+        parts.extend(initializations)
         
         # Generate test method
-        script_template += f'''
-    
-    async def run_test(self):
-        """Execute the generated test case"""
-        try:
-            await self.setup()
-            
-            # Test execution based on smart detection
-'''
+        parts.append(_PY_RUN_TEST_HEADER)
         
         test_steps = test_config.get('test_steps', [])
-        test_data = test_config.get('test_data', {})
         
         for i, step in enumerate(test_steps, 1):
-            script_template += f"            # Step {i}: {step}\n"
+            parts.append(f"            # Step {i}: {step}\n")
+            step_code = ""
             
             if "navigate" in step.lower():
-                script_template += f"            await self.page.goto('{test_data.get('url')}')\n"
-                script_template += "            await self.page.wait_for_load_state('networkidle')\n"
+                step_code += f"            await self.page.goto('{test_data.get('url')}')\n"
+                step_code += "            await self.page.wait_for_load_state('domcontentloaded')\n"
                 
             elif "email" in step.lower() and "fill" in step.lower():
-                email_elements = self._find_elements_by_type('email')
-                if email_elements:
-                    best_element = max(email_elements, key=lambda x: x[1].confidence)
-                    script_template += f"            await self.page.fill('{best_element[1].selector}', '{test_data.get('username')}')\n"
+                best_element = self._best_element('email')
+                if best_element:
+                    step_code += f"            await self.page.fill('{best_element[1].selector}', '{test_data.get('username')}')\n"
                     
             elif "password" in step.lower() and "fill" in step.lower():
-                password_elements = self._find_elements_by_type('password')
-                if password_elements:
-                    best_element = max(password_elements, key=lambda x: x[1].confidence)
-                    script_template += f"            await self.page.fill('{best_element[1].selector}', '{test_data.get('password')}')\n"
+                best_element = self._best_element('password')
+                if best_element:
+                    step_code += f"            await self.page.fill('{best_element[1].selector}', '{test_data.get('password')}')\n"
                     
             elif "sign in" in step.lower() or "click" in step.lower():
-                submit_elements = self._find_elements_by_type('submit')
-                if submit_elements:
-                    best_element = max(submit_elements, key=lambda x: x[1].confidence)
-                    script_template += f"            await self.page.click('{best_element[1].selector}')\n"
-                    script_template += "            await self.page.wait_for_load_state('networkidle')\n"
+                best_element = self._best_element('submit')
+                if best_element:
+                    step_code += f"            await self.page.click('{best_element[1].selector}')\n"
+                    
+            elif "verify" in step.lower() or "dashboard" in step.lower():
+                step_code += "            await self.verify_logged_in()\n"
             
-            script_template += "\n"
+            # A restored session is already signed in, so only navigation and verification still run
+            if step_code and "navigate" not in step.lower() and "verify_logged_in" not in step_code:
+                step_code = "            if not self.authenticated:\n" + step_code.replace("            ", "                ")
+            parts.append(step_code)
+            parts.append("\n")
         
-        script_template += '''
-            print("✅ Test completed successfully")
-            return True
-            
-        except Exception as e:
-            print(f"❌ Test failed: {e}")
-            return False
-            
-        finally:
-            await self.cleanup()
-    
-    async def cleanup(self):
-        """Cleanup browser resources"""
-        if self.browser:
-            await self.browser.close()
-
-async def main():
-    """Main execution function"""
-    test = SmartTestAutomation()
-    success = await test.run_test()
-    return success
-
-if __name__ == "__main__":
-    result = asyncio.run(main())
-    exit(0 if result else 1)
-'''
+        parts.append(_PY_RUN_TEST_FOOTER)
         
-        return script_template
+        return ''.join(parts)
     
     def _generate_page_object_class(self, page_name: str, page_data: Dict[str, Any]) -> str:
         """Generate a page object class"""
-        class_template = f'''
-class {page_name}Page:
-    """Smart Page Object for {page_name}"""
+        # The rendered class depends only on these values, in this order
+        element_rows = tuple((name, element_data['selector'], element_data['type'], element_data['confidence'])
+                             for name, element_data in page_data['elements'].items())
+        render = (self._render_page_object_class_cached if len(element_rows) >= _PAGE_CLASS_CACHE_MIN_ELEMENTS
+                  else self._render_page_object_class)
+        return render(page_name, page_data['url_pattern'], element_rows, tuple(page_data['actions']))
     
-    def __init__(self, page):
-        self.page = page
-        self.url_pattern = "{page_data['url_pattern']}"
-        
-        # Smart-detected element selectors (with confidence scores)
-'''
-        
-        for element_name, element_data in page_data['elements'].items():
-            confidence = element_data['confidence']
-            class_template += f"        self.{element_name} = '{element_data['selector']}'  # Confidence: {confidence:.2f}\n"
-        
-        class_template += "\n    # Generated action methods\n"
-        
-        for action in page_data['actions']:
-            method_name = action.split('(')[0]
-            if 'fill_' in method_name:
-                element_name = method_name.replace('fill_', '')
-                class_template += f'''
-    async def {method_name}(self, value: str):
-        """Fill {element_name} field"""
-        await self.page.fill(self.{element_name}, value)
-'''
-            elif 'click_' in method_name:
-                element_name = method_name.replace('click_', '')
-                class_template += f'''
-    async def {method_name}(self):
-        """Click {element_name} element"""
-        await self.page.click(self.{element_name})
-'''
+    @staticmethod
+    def _render_page_object_class(page_name: str, url_pattern: str,
+                                  element_rows: Tuple[Tuple[str, str, str, float], ...],
+                                  actions: Tuple[str, ...]) -> str:
+        """Render a page object class from (name, selector, type, confidence) rows"""
+        class_parts = [_PY_PAGE_CLASS_HEADER.format(page_name=page_name, url_pattern=url_pattern)]
+        append = class_parts.append
+        
+        # One locator per distinct selector; later duplicates are dropped with their actions
+        elements = {}
+        seen_selectors = set()
+        for element_name, selector, element_type, confidence in element_rows:
+            if selector in seen_selectors:
+                continue
+            seen_selectors.add(selector)
+            elements[element_name] = (element_type, confidence)
+            append(_PY_LOCATOR_LINE.format(name=element_name, selector=selector, confidence=confidence))
+        
+        append("        }\n")
+        append("\n    # Generated action methods\n")
+        
+        parsed_actions = [_parse_action(action) for action in actions]
+        emitted = [parsed for parsed in parsed_actions if parsed[2] in elements]
+        if len(emitted) >= _PAGE_ACTION_DISPATCH_MIN:
+            append(_PY_ACTION_TABLE_HEADER)
+            for kind, method_name, element_name in emitted:
+                append(_PY_ACTION_TABLE_LINE.format(method_name=method_name, kind=kind, element_name=element_name))
+            append(_PY_ACTION_DISPATCHER)
+        else:
+            for kind, method_name, element_name in emitted:
+                if kind == 'fill':
+                    append(_PY_FILL_METHOD.format(method_name=method_name, element_name=element_name))
+                else:
+                    append(_PY_CLICK_METHOD.format(method_name=method_name, element_name=element_name))
+        
+        # Credential fields can be filled together when both were detected
+        best_fills = {}
+        for kind, method_name, element_name in parsed_actions:
+            if kind == 'fill' and element_name in elements:
+                element_type, confidence = elements[element_name]
+                best = best_fills.get(element_type)
+                if best is None or confidence > best[0]:
+                    best_fills[element_type] = (confidence, method_name)
+
+        if 'email' in best_fills and 'password' in best_fills:
+            append(_PY_FILL_CREDENTIALS.format(email_method=best_fills['email'][1],
+                                               password_method=best_fills['password'][1]))
         
-        class_template += "\n"
-        return class_template
+        append("\n")
+        return ''.join(class_parts)
+    
+    # Same rendering, memoized; small pages are cheap enough to skip the cache
+    _render_page_object_class_cached = staticmethod(lru_cache(maxsize=256)(_render_page_object_class.__func__))
     
     async def _save_generated_files(self, test_config: Dict[str, Any], results: Dict[str, Any]):
         """Save all generated files"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        test_id = test_config.get('test_case_id', 'unknown')
-        
-        # Save automation script
-        script_filename = f"smart_generated_test_{test_id}_{timestamp}.py"
-        with open(script_filename, 'w') as f:
-            f.write(results['generated_script'])
-        
-        # Save page objects as JSON
-        page_objects_filename = f"smart_page_objects_{test_id}_{timestamp}.json"
-        with open(page_objects_filename, 'w') as f:
-            json.dump(results['page_objects'], f, indent=2)
-        
-        # Save execution report
-        report_filename = f"smart_execution_report_{test_id}_{timestamp}.json"
-        with open(report_filename, 'w') as f:
-            json.dump({
-                'test_case_id': results['test_case_id'],
-                'status': results['status'],
-                'execution_log': results['execution_log'],
-                'screenshots': results['screenshots'],
-                'generated_files': {
-                    'script': script_filename,
-                    'page_objects': page_objects_filename,
-                    'report': report_filename
-                }
-            }, f, indent=2)
+        # Every file of one run shares the same test id and timestamp suffix
+        suffix = f"{test_config.get('test_case_id', 'unknown')}_{_file_timestamp()}"
+        
+        script_filename = "smart_generated_test_" + suffix + ".py"
+        report_filename = "smart_execution_report_" + suffix + ".json"
+        
+        # Page objects carry no timestamp, so an unchanged set reuses the file saved earlier
+        page_objects_data = _encode_json(results['page_objects'])
+        page_objects_digest = blake2b(page_objects_data, digest_size=16).hexdigest()
+        loop = asyncio.get_running_loop()
+        previous_page_objects = await loop.run_in_executor(None, _previous_output, page_objects_digest)
+        page_objects_filename = previous_page_objects or "smart_page_objects_" + suffix + ".json"
+        
+        report = {
+            'test_case_id': results['test_case_id'],
+            'status': results['status'],
+            'execution_log': results['execution_log'],
+            'screenshots': results['screenshots'],
+            'generated_files': {
+                'script': script_filename,
+                'page_objects': page_objects_filename,
+                'report': report_filename
+            }
+        }
+        
+        # Write the script, page objects and report concurrently, off the event loop
+        writes = [loop.run_in_executor(None, _write_text, script_filename, results['generated_script']),
+                  loop.run_in_executor(None, _write_json, report_filename, report)]
+        if previous_page_objects is None:
+            writes.append(loop.run_in_executor(None, _write_bytes, page_objects_filename, page_objects_data))
+        await asyncio.gather(*writes)
+        if previous_page_objects is None:
+            await loop.run_in_executor(None, _remember_output, page_objects_digest, page_objects_filename)
         
         print(f"\n📁 Generated Files:")
         print(f"  • Smart Automation Script: {script_filename}")
@@ -798,9 +1287,23 @@ class {page_name}Page:
         print(f"  • Execution Report: {report_filename}")
     
     async def _cleanup(self):
-        """Cleanup browser resources"""
-        if self.browser:
-            await self.browser.close()
+        """Close this test case's context; the shared browser stays alive"""
+        # Let the last background screenshot finish before its page goes away
+        await self._finish_screenshot()
+        
+        if self.context:
+            await self.context.close()
+            self.context = None
+    
+    @classmethod
+    async def shutdown(cls):
+        """Close the pooled browsers and stop Playwright"""
+        for browser in cls._browser_pool.values():
+            await browser.close()
+        cls._browser_pool.clear()
+        if cls._playwright:
+            await cls._playwright.stop()
+            cls._playwright = None
 
 # Example usage and testing
 async def main():
@@ -832,7 +1335,10 @@ async def main():
     
     # Create and run the smart automation model
     model = SmartAutomationModel()
-    results = await model.process_test_case(test_config)
+    try:
+        results = await model.process_test_case(test_config)
+    finally:
+        await SmartAutomationModel.shutdown()
     
     print("\n🎯 Final Results:")
     print(f"Status: {results['status']}")
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The core modules import each other by bare name, as when run from their own directory
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "core_framework" / "utils"))
@@ -0,0 +1,90 @@
+"""Pin NLPProcessor parsing to the outputs of the original implementation"""
+from dataclasses import astuple
+
+import pytest
+
+import nlp_processor
+from nlp_processor import NLPProcessor
+
+BLOCK = """Navigate to https://example.com/login
+Fill email field with user@example.com
+Enter "secret" in password field
+Click the login button
+# comments are skipped
+Verify dashboard is visible
+wait for the spinner"""
+
+BLOCK_STEPS = [
+    (1, 'navigate', None, 'https://example.com/login', 'Navigate to https://example.com/login', 0.9),
+    (2, 'fill', "[name='username'], [name='email'], #email, #username", 'user@example.com',
+     'Fill email field with user@example.com', 0.85),
+    (3, 'generic', None, None, 'enter "secret" in password field', 0.3),
+    (4, 'click', "[type='submit'], button[type='submit'], .login-btn", None, 'Click the login button', 0.8),
+    (6, 'verify', "text='dashboard is visible'", None, 'Verify dashboard is visible', 0.7),
+    (7, 'wait', None, None, 'wait for the spinner', 0.5),
+]
+
+
+def test_parse_block():
+    steps = NLPProcessor().parse_natural_language_steps(BLOCK)
+    assert [astuple(step) for step in steps] == BLOCK_STEPS
+
+
+def test_iter_steps_matches_parse():
+    processor = NLPProcessor()
+    assert list(processor.iter_steps(BLOCK)) == processor.parse_natural_language_steps(BLOCK)
+
+
+def test_parse_returns_fresh_lists():
+    processor = NLPProcessor()
+    first = processor.parse_natural_language_steps(BLOCK)
+    first.clear()
+    assert len(processor.parse_natural_language_steps(BLOCK)) == len(BLOCK_STEPS)
+
+
+def test_parse_cache_is_shared_across_processors():
+    NLPProcessor._parse_cached.cache_clear()
+    NLPProcessor().parse_natural_language_steps(BLOCK)
+    NLPProcessor().parse_natural_language_steps(BLOCK)
+    assert NLPProcessor._parse_cached.cache_info().hits == 1
+
+
+def test_test_step_is_frozen():
+    step = nlp_processor.TestStep(1, 'click', 'button', None, 'Click button', 0.8)
+    with pytest.raises(AttributeError):
+        step.action = 'fill'
+    assert not hasattr(step, '__dict__')
+
+
+@pytest.mark.parametrize("line, expected", [
+    # URL tokens inside click/verify targets fall through to the regular selector rules
+    ("click https://x.com submit", (1, 'click', '.com', None, 'Click https://x.com submit', 0.8)),
+    ("verify https://x.com/home is visible",
+     (1, 'verify', '.com', None, 'Verify https://x.com/home is visible', 0.7)),
+    ("go to www.example.com", (1, 'navigate', None, 'www.example.com', 'Navigate to www.example.com', 0.9)),
+    ("navigate to https://x.com and click login",
+     (1, 'navigate', None, 'https://x.com and click login', 'Navigate to https://x.com and click login', 0.9)),
+])
+def test_parse_url_lines(line, expected):
+    assert [astuple(step) for step in NLPProcessor().parse_natural_language_steps(line)] == [expected]
+
+
+# _extract_selector expects lowercased, stripped text, as the parser passes it
+@pytest.mark.parametrize("text, selector", [
+    ("click https://x.com submit", ".com"),
+    ("https://x.com submit", ".com"),
+    ("https://x.com", ".com"),
+    ("www.example.com", ".example"),
+    ("the #login-btn", "#login-btn"),
+    ("the .primary button", ".primary"),
+    ("field name='user'", "[name='user']"),
+    ('text="welcome"', "text='welcome'"),
+    ("email address", "[name='username'], [name='email'], #email, #username"),
+    ("password box", "[name='password'], [type='password'], #password"),
+    ("send it", "[type='submit'], button[type='submit']"),
+    ("the link", "a"),
+    ("sign in", "[type='submit'], button[type='submit'], .login-btn"),
+    ("random words", "text='random words'"),
+])
+def test_extract_selector(text, selector):
+    assert NLPProcessor._extract_selector(text) == selector
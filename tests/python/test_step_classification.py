@@ -0,0 +1,73 @@
+"""Pin the regex step dispatch to the original if/elif keyword chains"""
+import itertools
+
+import pytest
+
+from automation_script_generator import _STEP_METHODS, _STEP_RE
+
+KEYWORDS = ['navigate', 'url', 'email', 'password', 'fill', 'sign in', 'login', 'click', 'verify', 'dashboard']
+
+# Every ordered pair of keywords, in mixed case, plus a few realistic steps
+STEPS = [f"Step 1: {a} the {b}" for a, b in itertools.product(KEYWORDS, repeat=2)] + [
+    "Step 1: Navigate to URL",
+    "Step 2: fill the email",
+    "Step 3: FILL the Password",
+    "Step 4: click on Sign in",
+    "Step 5: Verify dashboard loads successfully",
+    "Step 6: fill email and password",
+    "Step 7: wait a moment",
+    "",
+]
+
+
+def _baseline_script_method(step):
+    """Method the original generated script called for a step"""
+    step = step.lower()
+    if "navigate" in step or "url" in step:
+        return 'navigate_to_url'
+    elif "email" in step and "fill" in step:
+        return 'fill_email'
+    elif "password" in step and "fill" in step:
+        return 'fill_password'
+    elif "sign in" in step or "login" in step or "click" in step:
+        return 'click_signin'
+    elif "verify" in step or "dashboard" in step:
+        return 'verify_dashboard'
+    return None
+
+
+def _baseline_mcp_kind(step):
+    """Action kind the original MCP generators emitted code for"""
+    step = step.lower()
+    if "navigate" in step:
+        return 'nav'
+    elif "email" in step and "fill" in step:
+        return 'email'
+    elif "password" in step and "fill" in step:
+        return 'pwd'
+    elif "sign in" in step or "login" in step or "click" in step:
+        return 'submit'
+    elif "verify" in step or "dashboard" in step:
+        return 'verify'
+    return ''
+
+
+@pytest.mark.parametrize("step", STEPS)
+def test_script_step_dispatch(step):
+    match = _STEP_RE.match(step)
+    method = _STEP_METHODS[match.lastgroup] if match else None
+    expected = _baseline_script_method(step)
+    # Combined credential steps also fill the password; the email fill is unchanged
+    if method == 'fill_credentials':
+        assert expected == 'fill_email' and "password" in step.lower()
+    else:
+        assert method == expected
+
+
+@pytest.mark.parametrize("step", STEPS)
+def test_mcp_step_classification(step):
+    # The MCP generator imports the smart model, which needs Playwright
+    pytest.importorskip("playwright")
+    from playwright_mcp_generator import _classify_step
+
+    assert _classify_step(step.casefold()) == _baseline_mcp_kind(step)